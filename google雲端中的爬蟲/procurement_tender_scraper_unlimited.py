@@ -9,7 +9,6 @@ import re
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Dict, List, Optional
-from urllib.parse import urljoin
 
 from selenium import webdriver
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
@@ -29,6 +28,21 @@ class ProcurementTenderScraper:
     QUERY_URL = f"{BASE_URL}/prkms/tender/common/basic/indexTenderBasic"
     RESULT_URL_PATTERN = f"{BASE_URL}/prkms/tender/common/basic/readTenderBasic"
 
+    # 一次在瀏覽器內取出整頁表格：每列回傳 10 個欄位文字 + 「檢視」連結，
+    # 取代逐格 .text（每格一次 WebDriver 往返）
+    _ROWS_JS = """
+        return Array.from(document.querySelectorAll('#tpam tbody tr')).map(row => {
+            const cells = row.querySelectorAll('td');
+            if (cells.length < 10) return null;
+            const texts = Array.from(cells, c => c.innerText.trim()).slice(0, 9);
+            const view = Array.from(cells[9].querySelectorAll('a'))
+                .find(a => a.innerText.includes('檢視'));
+            const href = view ? view.getAttribute('href') : null;
+            texts.push(href && !href.toLowerCase().startsWith('javascript') ? view.href : null);
+            return texts;
+        });
+    """
+
     def __init__(self, headless: bool = False, wait_seconds: int = 20):
         self.headless = headless
         self.wait_seconds = wait_seconds
@@ -302,20 +316,19 @@ class ProcurementTenderScraper:
         不進入詳細頁面，直接從列表中提取所有可用資訊。
         """
         assert self.driver
-        rows = self.driver.find_elements(By.CSS_SELECTOR, "#tpam tbody tr")
+        rows = self.driver.execute_script(self._ROWS_JS) or []
         results: list[dict] = []
 
-        for row in rows:
-            cols = row.find_elements(By.TAG_NAME, "td")
-            if len(cols) < 10:  # 確保有足夠的欄位
+        for cols in rows:
+            if cols is None:  # 欄位不足的列
                 continue
 
             # 解析各欄位
-            seq = cols[0].text.strip()  # 項次
-            agency = cols[1].text.strip()  # 機關名稱
+            seq = cols[0]  # 項次
+            agency = cols[1]  # 機關名稱
 
             # 標案案號和名稱（在同一欄）
-            case_info = cols[2].text.strip()
+            case_info = cols[2]
             case_number = ""
             case_name = case_info
             if "\n" in case_info:
@@ -323,15 +336,15 @@ class ProcurementTenderScraper:
                 case_number = parts[0].strip()
                 case_name = parts[1].strip()
 
-            transmission_count = cols[3].text.strip()  # 傳輸次數
-            tender_method = cols[4].text.strip()  # 招標方式
-            procurement_type = cols[5].text.strip()  # 採購性質
-            announcement_date = cols[6].text.strip()  # 公告日期
-            deadline = cols[7].text.strip()  # 截止投標
-            budget = cols[8].text.strip()  # 預算金額
+            transmission_count = cols[3]  # 傳輸次數
+            tender_method = cols[4]  # 招標方式
+            procurement_type = cols[5]  # 採購性質
+            announcement_date = cols[6]  # 公告日期
+            deadline = cols[7]  # 截止投標
+            budget = cols[8]  # 預算金額
 
-            # 取得「檢視」連結作為 sourceUrl（從功能選項欄位）
-            source_url = self._extract_detail_link(cols[9])
+            # 「檢視」連結作為 sourceUrl（從功能選項欄位，瀏覽器已解析為絕對網址）
+            source_url = cols[9]
 
             # 驗證必要欄位
             if not case_name:
@@ -411,21 +424,6 @@ class ProcurementTenderScraper:
     # ------------------------------------------------------------------ #
     # 輔助工具
     # ------------------------------------------------------------------ #
-    def _extract_detail_link(self, cell) -> str | None:
-        """從功能選項欄位提取詳細頁面連結"""
-        try:
-            # 尋找包含 "檢視" 的連結
-            links = cell.find_elements(By.TAG_NAME, "a")
-            for link in links:
-                link_text = link.text.strip()
-                if "檢視" in link_text:
-                    href = link.get_attribute("href")
-                    if href and not href.lower().startswith("javascript"):
-                        return urljoin(self.BASE_URL, href)
-        except:
-            pass
-        return None
-
     @staticmethod
     def _match_keywords(text: str, keywords: list[str]) -> bool:
         text_lower = text.lower()
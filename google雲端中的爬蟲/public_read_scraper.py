@@ -5,9 +5,11 @@ https://web.pcc.gov.tw/pis/ 的「公開閱覽」查詢。
 """
 
 import json
+import queue
 import re
+import threading
 import time
-import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Dict, List, Optional
@@ -16,7 +18,7 @@ from urllib.parse import urljoin
 import requests
 from bs4 import BeautifulSoup
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
@@ -24,7 +26,14 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select, WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
-warnings.simplefilter("ignore", category=requests.packages.urllib3.exceptions.InsecureRequestWarning)  # type: ignore[attr-defined]
+# 翻頁列上的「共 N 頁」與分頁參數（displaytag 的 d-xxxxx-p 或 pageIndex）
+_TOTAL_PAGES_RE = re.compile(r"共\s*(\d+)\s*頁")
+_PAGE_PARAM_RE = re.compile(r"((?:d-\d+-p|pageIndex)=)\d+")
+
+# 附加說明中的 [預算金額]: XXX元 / 預算金額：XXX元，以及金額後的括號說明與結尾「元」
+_BUDGET_RE = re.compile(r"(?:\[預算金額\][：:]?\s*|預算金額[：:]\s*)(?P<v>[^\[\]\n\r]+)")
+_BUDGET_PAREN_RE = re.compile(r"\([^)]*\)|（[^）]*）")
+_BUDGET_TRAIL_YUAN_RE = re.compile(r"元?\s*$")
 
 
 class PublicReadScraper:
@@ -32,8 +41,10 @@ class PublicReadScraper:
 
     BASE_URL = "https://web.pcc.gov.tw"
     LIST_URL = f"{BASE_URL}/pis/"
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0 Safari/537.36"
+    PAGE_FETCH_WORKERS = 4  # 以 HTTP 平行抓取列表頁的執行緒數
 
-    def __init__(self, headless: bool = False, wait_seconds: int = 20):
+    def __init__(self, headless: bool = False, wait_seconds: int = 10):
         self.headless = headless
         self.wait_seconds = wait_seconds
         self.driver = None
@@ -53,13 +64,21 @@ class PublicReadScraper:
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--lang=zh-TW")
+        chrome_options.add_argument(f"user-agent={self.USER_AGENT}")
         chrome_options.add_argument(
-            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0 Safari/537.36"
+            "--disable-features=IsolateOrigins,site-per-process,TranslateUI,BlinkGenPropertyTrees"
         )
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.default_content_setting_values.geolocation": 2,
+        })
+        # DOMContentLoaded 即返回；Ajax 表格仍由後續的顯式等待確保載入
+        chrome_options.page_load_strategy = "eager"
 
         service = Service(ChromeDriverManager().install())
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, self.wait_seconds)
+        self.wait = WebDriverWait(self.driver, self.wait_seconds, poll_frequency=0.2)
         print("✓ Chrome WebDriver 初始化完成")
 
     def close_driver(self):
@@ -96,19 +115,67 @@ class PublicReadScraper:
         self._prepare_filters(start_date, end_date, date_mode)
         self._trigger_search()
 
-        all_items: list[dict] = []
-        page_index = 1
         max_pages = max_pages or 100  # 安全停損，避免無窮迴圈
+        all_items = self._scrape_pages_pipelined(max_pages, keywords)
+        print(f"\n✅ 完成，共擷取 {len(all_items)} 筆公開閱覽資料")
+        return all_items
+
+    # ------------------------------------------------------------------ #
+    # 逐頁 pipeline
+    # ------------------------------------------------------------------ #
+    def _scrape_pages_pipelined(self, max_pages: int, keywords: list[str] | None) -> list[dict]:
+        """
+        主執行緒負責翻頁並擷取頁面 HTML（producer），背景執行緒解析列表並把
+        細節頁以 HTTP 分派給 thread pool（consumer），讓翻頁等待與細節抓取重疊。
+        """
+        page_queue: queue.Queue = queue.Queue(maxsize=4)
+        page_rows: list[list[tuple[dict, Future | None]]] = []
+        session = self._build_http_session()
+
+        with ThreadPoolExecutor(max_workers=8) as detail_pool:
+            consumer = threading.Thread(
+                target=self._consume_pages,
+                args=(page_queue, page_rows, detail_pool, session, keywords),
+                daemon=True,
+            )
+            consumer.start()
+            try:
+                self._scrape_pages_producer(page_queue, max_pages, session)
+            finally:
+                page_queue.put(None)
+                consumer.join()
+
+            # 依頁面與列的插入順序彙整結果
+            all_items: list[dict] = []
+            for rows in page_rows:
+                for basic_info, detail_future in rows:
+                    if detail_future is not None:
+                        basic_info.update(detail_future.result())
+                    all_items.append(basic_info)
+
+        return all_items
+
+    def _scrape_pages_producer(self, page_queue: queue.Queue, max_pages: int, session: requests.Session):
+        assert self.driver
+        page_index = 1
 
         while page_index <= max_pages:
-            print(f"\n📄 解析第 {page_index} 頁 ...")
-            page_items = self._parse_current_page(keywords=keywords)
-            if not page_items:
+            if not self.driver.find_elements(By.CSS_SELECTOR, "#tpRead tbody tr"):
                 print("  ⚠ 本頁沒有可解析的資料，結束。")
                 break
 
-            all_items.extend(page_items)
-            print(f"  ✓ 本頁擷取 {len(page_items)} 筆，累計 {len(all_items)} 筆")
+            print(f"\n📄 擷取第 {page_index} 頁 ...")
+            page_queue.put((page_index, self.driver.page_source))
+
+            # 有「共 N 頁」且可用網址翻頁時，其餘頁面以帶查詢 session cookies 的 HTTP 平行抓取
+            if page_index == 1 and max_pages > 1:
+                total_pages = self._detect_total_pages()
+                page_url = self._detect_page_url_template()
+                if total_pages and total_pages > 1 and page_url:
+                    if total_pages > max_pages:
+                        print(f"⚠ 共 {total_pages} 頁，超過安全上限，只抓取前 {max_pages} 頁。")
+                    self._produce_pages_http(page_queue, session, page_url, min(total_pages, max_pages))
+                    return
 
             if page_index >= max_pages:
                 print(f"⚠ 達到預設安全上限 {max_pages} 頁，停止爬取。")
@@ -121,8 +188,127 @@ class PublicReadScraper:
                 print("  ✓ 已到最後一頁")
                 break
 
-        print(f"\n✅ 完成，共擷取 {len(all_items)} 筆公開閱覽資料")
-        return all_items
+    def _produce_pages_http(
+        self,
+        page_queue: queue.Queue,
+        session: requests.Session,
+        page_url: str,
+        last_page: int,
+    ):
+        """以 HTTP 平行抓取第 2..last_page 頁，依頁序放入佇列；失敗的頁面改由瀏覽器載入。"""
+        print(f"  → 以 {self.PAGE_FETCH_WORKERS} 個執行緒平行抓取第 2-{last_page} 頁")
+        with ThreadPoolExecutor(max_workers=self.PAGE_FETCH_WORKERS) as page_pool:
+            futures = {
+                page: page_pool.submit(self._fetch_list_page_http, session, page_url.replace("{page}", str(page)))
+                for page in range(2, last_page + 1)
+            }
+            for page, future in futures.items():
+                html = future.result()
+                if html is None:
+                    # 瀏覽器仍持有查詢 session，直接以分頁網址開啟
+                    html = self._open_list_page_in_browser(page_url.replace("{page}", str(page)))
+                if html is None:
+                    print(f"  ❌ 第 {page} 頁抓取失敗，略過")
+                    continue
+                print(f"\n📄 擷取第 {page} 頁 ...")
+                page_queue.put((page, html))
+
+    def _fetch_list_page_http(self, session: requests.Session, url: str) -> str | None:
+        """以 HTTP 抓取列表頁；失敗或回應中沒有結果表格時回傳 None。"""
+        try:
+            response = session.get(url, timeout=self.wait_seconds * 3)
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            print(f"  ⚠ 列表頁 HTTP 抓取失敗：{exc}")
+            return None
+        # session 失效時伺服器會導回查詢頁，此時沒有 tpRead 表格
+        return response.text if "tpRead" in response.text else None
+
+    def _open_list_page_in_browser(self, url: str) -> str | None:
+        assert self.driver and self.wait
+        print(f"  → 改以瀏覽器載入：{url}")
+        try:
+            self.driver.get(url)
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#tpRead tbody tr")))
+        except WebDriverException as exc:
+            print(f"  ⚠ 瀏覽器載入失敗：{exc}")
+            return None
+        return self.driver.page_source
+
+    def _detect_total_pages(self) -> int | None:
+        """從翻頁列的「共 N 頁」取得總頁數（翻頁列只列出部分頁碼，不以最大頁碼推算）。"""
+        assert self.driver
+        try:
+            text = self.driver.find_element(By.ID, "pagelinks").text
+        except NoSuchElementException:
+            return None
+        match = _TOTAL_PAGES_RE.search(text)
+        return int(match.group(1)) if match else None
+
+    def _detect_page_url_template(self) -> str | None:
+        """以「下一頁」連結推得分頁網址樣板（頁碼以 {page} 表示）。"""
+        assert self.driver
+        try:
+            next_link = self.driver.find_element(
+                By.XPATH, "//div[@id='pagelinks']//a[contains(text(),'下一頁')]"
+            )
+            href = next_link.get_attribute("href")
+        except NoSuchElementException:
+            return None
+        if not href or href.lower().startswith("javascript") or not _PAGE_PARAM_RE.search(href):
+            return None
+        return _PAGE_PARAM_RE.sub(lambda m: m.group(1) + "{page}", urljoin(self.BASE_URL, href))
+
+    def _consume_pages(
+        self,
+        page_queue: queue.Queue,
+        page_rows: list[list[tuple[dict, Future | None]]],
+        detail_pool: ThreadPoolExecutor,
+        session: requests.Session,
+        keywords: list[str] | None,
+    ):
+        while True:
+            item = page_queue.get()
+            if item is None:
+                break
+            page_index, html = item
+            try:
+                rows = self._parse_and_enrich(html, detail_pool, session, keywords)
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f"  ❌ 第 {page_index} 頁解析失敗：{exc}")
+                continue
+            page_rows.append(rows)
+            print(f"  ✓ 第 {page_index} 頁擷取 {len(rows)} 筆")
+
+    def _parse_and_enrich(
+        self,
+        html: str,
+        detail_pool: ThreadPoolExecutor,
+        session: requests.Session,
+        keywords: list[str] | None,
+    ) -> list[tuple[dict, Future | None]]:
+        """解析列表 HTML，並為每筆有細節連結的案件排入 HTTP 細節抓取。"""
+        soup = BeautifulSoup(html, "html.parser")
+        rows: list[tuple[dict, Future | None]] = []
+
+        for tr in soup.select("#tpRead tbody tr"):
+            cols = tr.find_all("td")
+            if len(cols) < 7:
+                continue
+
+            texts = [col.get_text(" ", strip=True) for col in cols[:6]]
+            detail_url = self._extract_link_from_soup_cell(cols[6]) or self._extract_link_from_soup_cell(cols[2])
+
+            if keywords and not self._match_keywords(f"{texts[1]}{texts[3]}", keywords):
+                continue
+
+            basic_info = self._build_basic_info(texts, detail_url)
+            detail_future = (
+                detail_pool.submit(self._fetch_detail_http, session, detail_url) if detail_url else None
+            )
+            rows.append((basic_info, detail_future))
+
+        return rows
 
     # ------------------------------------------------------------------ #
     # 查詢頁面操作
@@ -131,17 +317,16 @@ class PublicReadScraper:
         assert self.driver and self.wait
         print(f"開啟查詢頁面：{self.LIST_URL}")
         self.driver.get(self.LIST_URL)
-        # 等待查詢頁面載入，使用 ID 等待（這是頁面核心元素，應該穩定存在）
-        # 如果找不到，後續操作會失敗，所以這裡的等待是必要的
+        # 等待查詢頁面載入：ID 與寬鬆選擇器合併為單一等待，逾時只需付出一次 wait_seconds
         try:
-            self.wait.until(EC.presence_of_element_located((By.ID, "tenderTypeSelect")))
+            self.wait.until(EC.any_of(
+                EC.presence_of_element_located((By.ID, "tenderTypeSelect")),
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "select[id*='tenderType'], select[name*='tenderType']")
+                ),
+            ))
         except TimeoutException:
-            # 嘗試使用更寬鬆的選擇器
-            try:
-                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "select[id*='tenderType'], select[name*='tenderType']")))
-                print("  ⚠ 使用備用選擇器找到招標類型選擇器")
-            except TimeoutException:
-                raise RuntimeError("無法載入查詢頁面，找不到招標類型選擇器，請檢查頁面結構是否有變動")
+            raise RuntimeError("無法載入查詢頁面，找不到招標類型選擇器，請檢查頁面結構是否有變動")
 
     def _prepare_filters(self, start_date: str | None, end_date: str | None, date_mode: str):
         assert self.driver and self.wait
@@ -214,18 +399,15 @@ class PublicReadScraper:
         except TimeoutException:
             pass
 
-        # 使用 CSS selector 等待結果表格，比直接等待 ID 更穩健
-        # 如果 tpRead ID 不存在或命名不同，CSS selector 仍可能找到表格
-        # 直接等待表格行出現，這樣即使 ID 有變化也能正常工作
+        # 直接等待表格行出現；tpRead 與一般表格合併為單一等待，
+        # 即使 ID 有變化也能正常工作，且逾時只需付出一次 wait_seconds
         try:
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#tpRead tbody tr")))
+            self.wait.until(EC.any_of(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#tpRead tbody tr")),
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr")),
+            ))
         except TimeoutException:
-            # 如果找不到 tpRead，嘗試尋找其他可能的表格結構
-            try:
-                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr")))
-                print("  ⚠ 使用備用選擇器找到表格")
-            except TimeoutException:
-                raise RuntimeError("找不到查詢結果表格，請檢查頁面結構是否有變動")
+            raise RuntimeError("找不到查詢結果表格，請檢查頁面結構是否有變動")
         # 使用顯式等待，無需額外 sleep
         print("  ✓ 查詢結果載入完成")
 
@@ -258,34 +440,14 @@ class PublicReadScraper:
                 if len(cols) < 7:
                     continue
 
-                seq = cols[0].text.strip()
-                agency = cols[1].text.strip()
-
-                tender_id = cols[2].text.strip()
+                texts = [col.text.strip() for col in cols[:6]]
                 tender_id_link = self._extract_link_from_cell(cols[2])
-
-                tender_name = cols[3].text.strip()
-                announcement_count = cols[4].text.strip()
-
-                period_text = cols[5].text.strip()
-                period_start, period_end = self._parse_period(period_text)
-
                 detail_url = self._extract_link_from_cell(cols[6]) or tender_id_link
 
-                if keywords and not self._match_keywords(f"{agency}{tender_name}", keywords):
+                if keywords and not self._match_keywords(f"{texts[1]}{texts[3]}", keywords):
                     continue
 
-                basic_info = {
-                    "serial_no": seq,
-                    "agency": agency,
-                    "tenderId": tender_id,  # 統一使用 camelCase
-                    "tenderName": tender_name,  # 統一使用 camelCase（與促參一致）
-                    "announcement_count": announcement_count,
-                    "public_read_start": period_start,
-                    "public_read_end": period_end,
-                    "period_raw": period_text,
-                    "sourceUrl": detail_url,  # 統一使用 sourceUrl（與促參一致）
-                }
+                basic_info = self._build_basic_info(texts, detail_url)
 
                 # 解析詳細頁面資訊
                 if detail_url:
@@ -315,6 +477,22 @@ class PublicReadScraper:
 
         return results
 
+    def _build_basic_info(self, texts: list[str], detail_url: str | None) -> dict:
+        """由列表前六欄文字組出基本資料。"""
+        seq, agency, tender_id, tender_name, announcement_count, period_text = texts[:6]
+        period_start, period_end = self._parse_period(period_text)
+        return {
+            "serial_no": seq,
+            "agency": agency,
+            "tenderId": tender_id,  # 統一使用 camelCase
+            "tenderName": tender_name,  # 統一使用 camelCase（與促參一致）
+            "announcement_count": announcement_count,
+            "public_read_start": period_start,
+            "public_read_end": period_end,
+            "period_raw": period_text,
+            "sourceUrl": detail_url,  # 統一使用 sourceUrl（與促參一致）
+        }
+
     def _go_to_next_page(self) -> bool:
         assert self.driver and self.wait
         # 嘗試找到表格，使用更寬鬆的選擇器
@@ -345,12 +523,11 @@ class PublicReadScraper:
 
             self.driver.execute_script("arguments[0].click();", next_link)
             self.wait.until(EC.staleness_of(table))
-            # 等待新表格出現，使用更寬鬆的選擇器
-            try:
-                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#tpRead tbody tr")))
-            except TimeoutException:
-                # 如果找不到 tpRead，嘗試等待任何表格行
-                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr")))
+            # 等待新表格出現，tpRead 與任何表格行合併為單一等待
+            self.wait.until(EC.any_of(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#tpRead tbody tr")),
+                EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr")),
+            ))
             return True
         except NoSuchElementException:
             return False
@@ -405,61 +582,7 @@ class PublicReadScraper:
             # 取得頁面原始碼
             page_source = self.driver.page_source
             soup = BeautifulSoup(page_source, "html.parser")
-
-            detail_basic = self._parse_basic_detail_table(soup)
-            attachments = self._parse_attachment_table(soup, detail_url)
-
-            print(f"      📄 解析到 {len(detail_basic)} 個基本欄位，{len(attachments)} 個附件")
-
-            # 從各個欄位中提取預算金額
-            budget_amount = None
-            budget_source = ""
-            description = detail_basic.get("附加說明", "")
-
-            # 1. 優先檢查是否有專門的預算金額欄位
-            if detail_basic.get("預算金額", "").strip():
-                budget_amount = detail_basic["預算金額"].strip()
-                budget_source = "預算金額欄位"
-                print(f"      💰 從預算金額欄位取得：{budget_amount}")
-
-            # 2. 如果沒有，檢查附加說明
-            if not budget_amount:
-                if description:
-                    extracted = self._extract_budget_from_description(description)
-                    if extracted:
-                        budget_amount = extracted
-                        budget_source = "附加說明"
-                        print(f"      💰 從附加說明提取：{budget_amount}")
-                    else:
-                        print(f"      📝 附加說明長度：{len(description)} 字，未找到預算金額")
-
-            # 3. 檢查其他可能的欄位
-            if not budget_amount:
-                possible_fields = ["採購金額級距", "預算金額是否公開", "決標金額", "預算價金", "契約金額"]
-                for field in possible_fields:
-                    if detail_basic.get(field, "").strip():
-                        value = detail_basic[field].strip()
-                        # 檢查是否包含金額模式
-                        if "元" in value or any(char.isdigit() for char in value):
-                            budget_amount = value
-                            budget_source = f"{field}欄位"
-                            print(f"      💰 從{field}欄位取得：{budget_amount}")
-                            break
-
-            # 更新或新增預算金額欄位
-            if budget_amount:
-                detail_basic["預算金額"] = budget_amount
-                detail_basic["預算金額來源"] = budget_source
-                print(f"      ✅ 預算金額來源：{budget_source}")
-            else:
-                print(f"      ⚠️ 未找到任何預算金額資訊")
-
-            return {
-                "detail_url": detail_url,
-                "detail_basic": detail_basic,
-                "detail_description": description,
-                "attachments": attachments,
-            }
+            return self._build_detail_info(soup, detail_url)
 
         except Exception as exc:
             print(f"      ❌ 解析詳細頁面失敗：{exc}")
@@ -467,28 +590,112 @@ class PublicReadScraper:
 
         finally:
             # 無論成功或失敗，都要返回列表頁面
-            try:
-                print(f"      🔙 返回列表頁面")
-                # 使用 back() 返回上一頁，而不是直接訪問 URL
-                self.driver.back()
+            self._return_to_list_page()
 
-                # 等待頁面載入完成
-                self.wait.until(lambda d: "tpRead" in d.current_url or "readTpRead" in d.current_url)
+    def _build_http_session(self) -> requests.Session:
+        """以 WebDriver 目前的 cookies 建立 requests session，供細節頁 HTTP 抓取。"""
+        assert self.driver
+        session = requests.Session()
+        session.headers["User-Agent"] = self.USER_AGENT
+        for cookie in self.driver.get_cookies():
+            session.cookies.set(
+                cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/")
+            )
+        return session
+
+    def _fetch_detail_http(self, session: requests.Session, detail_url: str) -> dict:
+        """以 HTTP 直接抓取細節頁（不經 WebDriver），可在背景執行緒平行執行。"""
+        try:
+            response = session.get(detail_url, timeout=self.wait_seconds * 3)
+            response.raise_for_status()
+            soup = BeautifulSoup(response.content, "html.parser")
+            return self._build_detail_info(soup, detail_url)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"      ❌ 解析詳細頁面失敗：{exc}")
+            return {"detail_url": detail_url, "detail_error": str(exc)}
 
-                # 確保表格存在
-                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#tpRead tbody tr")))
+    def _build_detail_info(self, soup: BeautifulSoup, detail_url: str) -> dict:
+        """解析細節頁的基本欄位、附件與預算金額。"""
+        detail_basic = self._parse_basic_detail_table(soup)
+        attachments = self._parse_attachment_table(soup, detail_url)
+
+        print(f"      📄 解析到 {len(detail_basic)} 個基本欄位，{len(attachments)} 個附件")
+
+        # 從各個欄位中提取預算金額
+        budget_amount = None
+        budget_source = ""
+        description = detail_basic.get("附加說明", "")
+
+        # 1. 優先檢查是否有專門的預算金額欄位
+        if detail_basic.get("預算金額", "").strip():
+            budget_amount = detail_basic["預算金額"].strip()
+            budget_source = "預算金額欄位"
+            print(f"      💰 從預算金額欄位取得：{budget_amount}")
+
+        # 2. 如果沒有，檢查附加說明
+        if not budget_amount:
+            if description:
+                extracted = self._extract_budget_from_description(description)
+                if extracted:
+                    budget_amount = extracted
+                    budget_source = "附加說明"
+                    print(f"      💰 從附加說明提取：{budget_amount}")
+                else:
+                    print(f"      📝 附加說明長度：{len(description)} 字，未找到預算金額")
+
+        # 3. 檢查其他可能的欄位
+        if not budget_amount:
+            possible_fields = ["採購金額級距", "預算金額是否公開", "決標金額", "預算價金", "契約金額"]
+            for field in possible_fields:
+                if detail_basic.get(field, "").strip():
+                    value = detail_basic[field].strip()
+                    # 檢查是否包含金額模式
+                    if "元" in value or any(char.isdigit() for char in value):
+                        budget_amount = value
+                        budget_source = f"{field}欄位"
+                        print(f"      💰 從{field}欄位取得：{budget_amount}")
+                        break
+
+        # 更新或新增預算金額欄位
+        if budget_amount:
+            detail_basic["預算金額"] = budget_amount
+            detail_basic["預算金額來源"] = budget_source
+            print(f"      ✅ 預算金額來源：{budget_source}")
+        else:
+            print(f"      ⚠️ 未找到任何預算金額資訊")
 
-                print(f"      ✅ 成功返回列表頁面")
-            except Exception as e:
-                print(f"      ⚠️ 返回列表頁面失敗：{e}")
-                # 如果返回失敗，嘗試重新載入列表頁面
-                try:
-                    print(f"      🔄 嘗試重新載入列表頁面")
-                    # 重新執行查詢來恢復列表頁面
-                    self._trigger_search()
-                    print(f"      ✅ 重新載入列表頁面成功")
-                except Exception as e2:
-                    print(f"      ❌ 重新載入列表頁面也失敗：{e2}")
+        return {
+            "detail_url": detail_url,
+            "detail_basic": detail_basic,
+            "detail_description": description,
+            "attachments": attachments,
+        }
+
+    def _return_to_list_page(self):
+        """細節頁處理完畢後返回列表頁面。"""
+        assert self.driver and self.wait
+        try:
+            print(f"      🔙 返回列表頁面")
+            # 使用 back() 返回上一頁，而不是直接訪問 URL
+            self.driver.back()
+
+            # 等待頁面載入完成
+            self.wait.until(lambda d: "tpRead" in d.current_url or "readTpRead" in d.current_url)
+
+            # 確保表格存在
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#tpRead tbody tr")))
+
+            print(f"      ✅ 成功返回列表頁面")
+        except Exception as e:
+            print(f"      ⚠️ 返回列表頁面失敗：{e}")
+            # 如果返回失敗，嘗試重新載入列表頁面
+            try:
+                print(f"      🔄 嘗試重新載入列表頁面")
+                # 重新執行查詢來恢復列表頁面
+                self._trigger_search()
+                print(f"      ✅ 重新載入列表頁面成功")
+            except Exception as e2:
+                print(f"      ❌ 重新載入列表頁面也失敗：{e2}")
 
     @staticmethod
     def _parse_basic_detail_table(soup: BeautifulSoup) -> dict:
@@ -590,6 +797,14 @@ class PublicReadScraper:
             return None
         return None
 
+    @staticmethod
+    def _extract_link_from_soup_cell(cell) -> str | None:
+        link = cell.find("a")
+        href = link.get("href") if link else None
+        if href and not href.lower().startswith("javascript"):
+            return urljoin(PublicReadScraper.BASE_URL, href)
+        return None
+
     @staticmethod
     def _parse_period(period_text: str) -> tuple[str | None, str | None]:
         if not period_text:
@@ -604,31 +819,17 @@ class PublicReadScraper:
     @staticmethod
     def _extract_budget_from_description(description: str) -> str | None:
         """從附加說明中提取預算金額"""
-        import re
-
-        # 匹配 [預算金額]: XXX元 或類似格式
-        patterns = [
-            r'\[預算金額\]:\s*([^\[\]\n]+)',
-            r'預算金額[：:]\s*([^\n\r]+)',
-            r'\[預算金額\]([^(]+)',
-        ]
+        # 大多數說明根本沒有預算金額，先以子字串檢查略過 regex
+        if "預算金額" not in description:
+            return None
 
-        for pattern in patterns:
-            match = re.search(pattern, description, re.IGNORECASE)
-            if match:
-                budget = match.group(1).strip()
-                # 清理常見的後綴和括號內容
-                # 先移除包含"元"的括號內容
-                budget = re.sub(r'\([^)]*元[^)]*\)', '', budget)
-                budget = re.sub(r'（[^）]*元[^）]*）', '', budget)
-                # 再移除其他括號內容
-                budget = re.sub(r'\([^)]*\)', '', budget)
-                budget = re.sub(r'（[^）]*）', '', budget)
-                # 移除結尾的"元"和空白
-                budget = re.sub(r'元?\s*$', '', budget)
-                return budget.strip()
+        match = _BUDGET_RE.search(description)
+        if not match:
+            return None
 
-        return None
+        # 移除括號內容（半形與全形）及結尾的「元」
+        budget = _BUDGET_PAREN_RE.sub("", match.group("v").strip())
+        return _BUDGET_TRAIL_YUAN_RE.sub("", budget).strip()
 
     @staticmethod
     def _match_keywords(text: str, keywords: list[str]) -> bool:
@@ -3,12 +3,21 @@ Main runner for automated data collection.
 Runs all scrapers and uploads results to Google Drive.
 """
 
-import json
+import gc
+import hashlib
 import os
 import sys
+import tempfile
+import time
 import traceback
-from datetime import datetime
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, suppress
+from functools import partial
 from pathlib import Path
+from typing import Iterator
+
+import orjson
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -19,50 +28,209 @@ from utils import Config, DriveUploader, run_data_cleaner
 
 def save_result(result: dict, prefix: str) -> str:
     """Save result to JSON file and return the path."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     filename = f"{prefix}_{timestamp}.json"
     filepath = Config.get_output_path(filename)
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    option = orjson.OPT_NON_STR_KEYS
+    if Config.PRETTY_JSON:
+        option |= orjson.OPT_INDENT_2
+    
+    with open(filepath, 'wb', buffering=1 << 20) as f:
+        f.write(orjson.dumps(result, option=option))
     
     print(f"  💾 Saved: {filepath}")
     return filepath
 
 
+class ResultStream:
+    """Record sink that appends each record to a JSON Lines file and tracks stats."""
+    
+    def __init__(self, f, path: str):
+        self._file = f
+        self.path = path
+        self.header = {}
+        self.total_records = 0
+        self.agencies = set()
+    
+    def __call__(self, record: dict) -> None:
+        self._file.write(orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS))
+        self._file.write(b"\n")
+        self.total_records += 1
+        agency = record.get("agency")
+        if agency:
+            self.agencies.add(agency)
+
+
+@contextmanager
+def save_result_stream(prefix: str) -> Iterator[ResultStream]:
+    """
+    Open <prefix>_<ts>.jsonl and yield a write(record) callable.
+    
+    Set `header` on the yielded writer before leaving the block; it is written
+    with the stats to a <prefix>_<ts>.meta.json sidecar. Records go to a .part
+    file that is renamed into place only once the block succeeds, so a failed
+    scraper leaves nothing behind. Empty streams are removed.
+    """
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    filepath = Config.get_output_path(f"{prefix}_{timestamp}.jsonl")
+    meta_path = Config.get_output_path(f"{prefix}_{timestamp}.meta.json")
+    part_path = f"{filepath}.part"
+    
+    try:
+        with open(part_path, 'wb', buffering=1 << 20) as f:
+            stream = ResultStream(f, filepath)
+            yield stream
+        
+        if not stream.total_records:
+            os.remove(part_path)
+            return
+        
+        meta = {
+            **stream.header,
+            "stats": {
+                "totalRecords": stream.total_records,
+                "totalAgencies": len(stream.agencies),
+            },
+            "totalRecords": stream.total_records,
+            "dataFile": os.path.basename(filepath),
+        }
+        with open(meta_path, 'wb') as f:
+            f.write(orjson.dumps(meta, option=orjson.OPT_INDENT_2))
+        os.replace(part_path, filepath)
+    except BaseException:
+        for path in (part_path, meta_path):
+            with suppress(FileNotFoundError):
+                os.remove(path)
+        raise
+    
+    print(f"  💾 Saved: {filepath}")
+
+
+def log_memory(stage: str) -> None:
+    """Print Python heap usage and peak RSS for a stage (only when TRACE_MEMORY=1)."""
+    if not Config.TRACE_MEMORY:
+        return
+    current, peak = tracemalloc.get_traced_memory()
+    heap = f"heap {current / 2**20:.1f} MiB (peak {peak / 2**20:.1f} MiB)"
+    try:
+        import resource  # Unix only
+    except ImportError:
+        print(f"  🧠 [{stage}] {heap}")
+        return
+    # ru_maxrss is in KiB on Linux; children covers the scraper worker processes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // 1024
+    print(f"  🧠 [{stage}] {heap}, max RSS {rss} MiB (workers {children_rss} MiB)")
+
+
+def run_scraper_streaming(runner, prefix: str) -> dict:
+    """Run a scraper with its records streamed to disk; returns a small summary."""
+    with save_result_stream(prefix) as write:
+        result = runner(on_record=write)
+        write.header = {
+            key: value for key, value in result.items()
+            if key not in ("stats", "totalRecords", "data")
+        }
+    
+    # Records are already on disk; free them before the worker picks up another scraper
+    del result
+    gc.collect()
+    
+    return {
+        "totalRecords": write.total_records,
+        "path": write.path if write.total_records else None,
+    }
+
+
 def run_all_scrapers() -> list:
-    """Run all scrapers and return list of output files."""
+    """Run all scrapers in parallel processes and return list of output files."""
     output_files = []
     
     scrapers = [
-        ("public-read", run_public_read_scraper, "public_read"),
-        ("ppp-mof", run_procurement_scraper, "procurement"),
-        ("tender", run_tender_scraper, "tender_announcement"),
+        (name, partial(runner, reuse_driver=Config.REUSE_DRIVER), prefix)
+        for name, runner, prefix in (
+            ("public-read", run_public_read_scraper, "public_read"),
+            ("ppp-mof", run_procurement_scraper, "procurement"),
+            ("tender", run_tender_scraper, "tender_announcement"),
+        )
     ]
     
-    for name, runner, prefix in scrapers:
-        print(f"\n{'=' * 60}")
-        print(f"🔍 Running: {name}")
-        print('=' * 60)
+    # Each scraper drives its own Chrome; WebDriver is not thread-safe, so use processes
+    max_workers = max(1, min(Config.SCRAPER_CONCURRENCY, len(scrapers)))
+    print(f"\n🔀 Running {len(scrapers)} scrapers with {max_workers} worker process(es)")
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            (
+                executor.submit(run_scraper_streaming, runner, prefix)
+                if Config.STREAM_OUTPUT else executor.submit(runner)
+            ): (name, prefix)
+            for name, runner, prefix in scrapers
+        }
         
-        try:
-            result = runner()
-            total = result.get('totalRecords', 0)
-            print(f"  ✓ Found {total} records")
+        for future in as_completed(futures):
+            # Drop the future's reference so its result can be freed after saving
+            name, prefix = futures.pop(future)
+            print(f"\n{'=' * 60}")
+            print(f"🔍 Finished: {name}")
+            print('=' * 60)
             
-            if total > 0:
-                filepath = save_result(result, prefix)
-                output_files.append(filepath)
-            else:
-                print(f"  ⚠ No records found, skipping save")
+            try:
+                result = future.result()
+                total = result.get('totalRecords', 0)
+                print(f"  ✓ Found {total} records")
                 
-        except Exception as e:
-            print(f"  ✗ Error running {name}: {e}")
-            traceback.print_exc()
+                if total > 0:
+                    if Config.STREAM_OUTPUT:
+                        filepath = result['path']
+                    else:
+                        filepath = save_result(result, prefix)
+                    output_files.append(filepath)
+                else:
+                    print(f"  ⚠ No records found, skipping save")
+                    
+            except Exception as e:
+                print(f"  ✗ Error running {name}: {e}")
+                traceback.print_exc()
+            
+            result = future = None
+            gc.collect()
+            log_memory(name)
     
     return output_files
 
 
+def _file_sha256(filepath: str) -> str:
+    """Return the SHA-256 hex digest of a file."""
+    with open(filepath, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def _load_upload_cache() -> dict:
+    """Load the {filename: sha256} map of files already uploaded."""
+    try:
+        with open(Config.get_output_path(Config.UPLOAD_CACHE_FILE), 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return {}
+
+
+def _save_upload_cache(cache: dict) -> None:
+    """Persist the upload cache atomically (write temp file, then rename)."""
+    path = Config.get_output_path(Config.UPLOAD_CACHE_FILE)
+    # Unique temp name in the same directory, so concurrent runs never share it
+    with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(path) or '.',
+                                     suffix='.tmp', delete=False) as f:
+        f.write(orjson.dumps(cache))
+    try:
+        os.replace(f.name, path)
+    except OSError:
+        with suppress(FileNotFoundError):
+            os.remove(f.name)
+        raise
+
+
 def upload_to_drive(files: list) -> None:
     """Upload files to Google Drive."""
     if not files:
@@ -84,10 +252,27 @@ def upload_to_drive(files: list) -> None:
     try:
         uploader = DriveUploader(service_account_file, folder_id)
         
+        # Skip files whose content was already uploaded under the same name
+        cache = _load_upload_cache()
+        pending = {}
         for filepath in files:
-            uploader.upload_file(filepath)
+            digest = _file_sha256(filepath)
+            if cache.get(Path(filepath).name) == digest:
+                print(f"  ⏭ Unchanged, skipped: {Path(filepath).name}")
+            else:
+                pending[filepath] = digest
+        
+        def record_upload(filepath: str, file_id: str) -> None:
+            cache[Path(filepath).name] = pending[filepath]
+            _save_upload_cache(cache)
+        
+        file_ids = uploader.upload_files(
+            list(pending), max_workers=Config.GDRIVE_CONCURRENCY, on_uploaded=record_upload
+        )
+        uploaded = sum(1 for file_id in file_ids if file_id)
             
-        print(f"\n✓ Uploaded {len(files)} files to Google Drive")
+        skipped = len(files) - len(pending)
+        print(f"\n✓ Uploaded {uploaded}/{len(pending)} files to Google Drive ({skipped} unchanged)")
         
     except Exception as e:
         print(f"\n✗ Upload error: {e}")
@@ -98,14 +283,19 @@ def main():
     """Main entry point."""
     print("\n" + "=" * 60)
     print("🚀 Automated Data Collection")
-    print(f"   Started at: {datetime.now().isoformat()}")
+    started_at = time.time()
+    print(f"   Started at: {time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started_at))}")
     print("=" * 60)
     
     # Create output directory
     os.makedirs(Config.OUTPUT_DIR, exist_ok=True)
     
+    if Config.TRACE_MEMORY:
+        tracemalloc.start()
+    
     # Run all scrapers
     output_files = run_all_scrapers()
+    log_memory("scrapers")
     
     # Run data cleaner to merge and deduplicate
     print("\n" + "=" * 60)
@@ -113,17 +303,19 @@ def main():
     print("=" * 60)
     
     try:
-        cleaner_result = run_data_cleaner(Config.OUTPUT_DIR)
+        cleaner_result = run_data_cleaner(Config.OUTPUT_DIR, pretty=Config.PRETTY_JSON)
         merged_files = cleaner_result.get("merged_files", [])
         print(f"  ✓ Generated {len(merged_files)} merged files")
     except Exception as e:
         print(f"  ✗ Data cleaner error: {e}")
         traceback.print_exc()
         merged_files = []
+    log_memory("data cleaner")
     
     # Upload merged files to Google Drive (instead of raw scraper output)
     files_to_upload = merged_files if merged_files else output_files
     upload_to_drive(files_to_upload)
+    log_memory("upload")
     
     # Summary
     print("\n" + "=" * 60)
@@ -134,7 +326,8 @@ def main():
     print(f"  Files uploaded: {len(files_to_upload)}")
     for f in files_to_upload:
         print(f"    - {os.path.basename(f)}")
-    print(f"  Finished at: {datetime.now().isoformat()}")
+    print(f"  Finished at: {time.strftime('%Y-%m-%dT%H:%M:%S')} "
+          f"({time.time() - started_at:.0f}s)")
     print("=" * 60 + "\n")
 
 
@@ -1,5 +1,6 @@
 """Scraper modules for data collection."""
 
+from .chromedriver import get_driver_path, shutdown_drivers
 from .procurement_scraper import ProcurementScraper, run_procurement_scraper
 from .tender_scraper import TenderScraper, run_tender_scraper
 from .public_read_scraper import PublicReadScraper, run_public_read_scraper
@@ -8,4 +9,5 @@ __all__ = [
     'ProcurementScraper', 'run_procurement_scraper',
     'TenderScraper', 'run_tender_scraper',
     'PublicReadScraper', 'run_public_read_scraper',
+    'get_driver_path', 'shutdown_drivers',
 ]
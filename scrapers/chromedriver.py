@@ -0,0 +1,153 @@
+"""
+Shared chromedriver resolution and Chrome launch flags for all scrapers.
+Resolves the driver binary once per process instead of on every setup_driver(),
+and can keep a launched browser alive for reuse by a later scrape.
+"""
+
+import atexit
+import json
+import os
+from functools import lru_cache
+from multiprocessing.util import Finalize
+from typing import Callable, Dict, Optional, Tuple
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.driver_cache import DriverCacheManager
+
+
+CACHE_VALID_DAYS = 7  # webdriver_manager only re-checks for a newer driver weekly
+
+# Flags that trim Chrome startup work and resident memory for one-tab scraping:
+# no background services or first-run setup, and at most two renderer processes
+LEAN_CHROME_ARGS = (
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--renderer-process-limit=2",
+)
+
+# Requests the scrapers never need, blocked via CDP Network.setBlockedURLs:
+# images, stylesheets and fonts, plus analytics/ad/tracker hosts, so Chrome
+# does not even open connections (DNS + TLS) to those third parties
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.woff*", "*.css",
+    "*/analytics*", "*google-analytics*", "*googletagmanager*",
+    "*doubleclick*", "*facebook.net*", "*hotjar*", "*/tracker*",
+]
+
+
+@lru_cache(maxsize=None)
+def get_driver_path() -> str:
+    """
+    Return the chromedriver binary path.
+    
+    Order: $CHROMEDRIVER_PATH, then webdriver_manager, whose own cache is reused
+    for CACHE_VALID_DAYS before it checks for a driver matching the installed Chrome.
+    """
+    env_path = os.environ.get("CHROMEDRIVER_PATH")
+    if env_path:
+        return env_path
+    
+    cache_manager = DriverCacheManager(valid_range=CACHE_VALID_DAYS)
+    return ChromeDriverManager(cache_manager=cache_manager).install()
+
+
+# Idle browsers kept alive by release_driver(keep_alive=True), keyed by launch
+# options, and browsers currently checked out (id -> (key, driver)); both are
+# owned by _driver_cache_pid
+_driver_cache: Dict[str, webdriver.Chrome] = {}
+_checked_out: Dict[int, Tuple[str, webdriver.Chrome]] = {}
+_driver_cache_pid: Optional[int] = None
+
+
+def _claim_driver_cache() -> None:
+    """Take ownership of the cache in this process and register shutdown hooks once."""
+    global _driver_cache_pid
+    if _driver_cache_pid == os.getpid():
+        return
+    # A forked child inherits the parent's entries but not its browsers
+    _driver_cache.clear()
+    _checked_out.clear()
+    _driver_cache_pid = os.getpid()
+    atexit.register(shutdown_drivers)
+    # ProcessPoolExecutor workers skip atexit hooks but run multiprocessing finalizers
+    Finalize(None, shutdown_drivers, exitpriority=10)
+
+
+def _options_key(options: Options) -> str:
+    """Cache key for a launch configuration: scrapers with identical options share a browser."""
+    return json.dumps(options.to_capabilities(), sort_keys=True)
+
+
+def get_cached_driver(options: Options,
+                      launch: Callable[[Options], webdriver.Chrome]) -> webdriver.Chrome:
+    """
+    Check out an idle browser launched with these options, or launch(options) a new one.
+    
+    Saves the Chrome cold start (1-3 s) when a browser kept alive by
+    release_driver(keep_alive=True) is requested again in the same process.
+    A checked-out browser is never handed to another caller until it is released.
+    """
+    _claim_driver_cache()
+    key = _options_key(options)
+    driver = _driver_cache.pop(key, None)
+    if driver is not None and not driver.service.is_connectable():
+        _quit_quietly(driver)
+        driver = None
+    
+    if driver is None:
+        driver = launch(options)
+    _checked_out[id(driver)] = (key, driver)
+    return driver
+
+
+def release_driver(driver: webdriver.Chrome, keep_alive: bool = False) -> None:
+    """
+    Hand a browser back after a scrape.
+    
+    By default it is quit so its memory is freed at once. With keep_alive it is
+    reset (cookies cleared, blank page) and cached as idle for the next scrape;
+    it is then quit at process exit, or right away if it no longer responds or
+    an idle browser with the same options is already cached.
+    """
+    key, _ = _checked_out.pop(id(driver), (None, None))
+    if keep_alive and key is not None and key not in _driver_cache:
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            _driver_cache[key] = driver
+            return
+        except WebDriverException:
+            pass
+    
+    _quit_quietly(driver)
+
+
+def live_driver_count() -> int:
+    """Number of browsers this process holds, idle or checked out."""
+    if _driver_cache_pid != os.getpid():
+        return 0
+    return len(_driver_cache) + len(_checked_out)
+
+
+def shutdown_drivers() -> None:
+    """Quit every browser this process launched, idle or checked out."""
+    while _driver_cache:
+        _, driver = _driver_cache.popitem()
+        _quit_quietly(driver)
+    while _checked_out:
+        _, (_, driver) = _checked_out.popitem()
+        _quit_quietly(driver)
+
+
+def _quit_quietly(driver: webdriver.Chrome) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
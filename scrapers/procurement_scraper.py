@@ -3,20 +3,35 @@ PPP MOF Platform Scraper - Cloud optimized version
 Scrapes promotion participation platform data.
 """
 
+import gc
 import re
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from urllib.parse import urljoin
 
+import requests
+import soupsieve
+from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from .chromedriver import (
+    BLOCKED_URLS, LEAN_CHROME_ARGS, get_cached_driver, get_driver_path, release_driver,
+)
+
+try:
+    import lxml  # noqa: F401  (C parser, several times faster than html.parser)
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
 
 
 class ProcurementScraper:
@@ -25,9 +40,28 @@ class ProcurementScraper:
     BASE_URL = "https://ppp.mof.gov.tw/WWW/"
     ANNOUNCE_URL = f"{BASE_URL}ann_search4.aspx"
     REGISTERED_URL = f"{BASE_URL}case_search4.aspx"
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    TABLE_KEYWORDS = ["案件名稱", "公告機關", "案件編號"]
+    TABLE_CSS = "table.table-rwd"
+    TABLE_SELECTOR = soupsieve.compile(TABLE_CSS)  # compiled once, reused per page
+    POSTBACK_RE = re.compile(r"__doPostBack\('([^']*)','([^']*)'\)")
+    PAGE_ARG_RE = re.compile(r"Page\$(\d+)$")  # GridView pager postback argument
+    PAGE_FETCH_WORKERS = 4
+    # Visible <a> whose text contains 下一頁, else is exactly '>', else with a 'next' class
+    FIND_NEXT_LINK_JS = """
+        const links = Array.from(document.querySelectorAll('a'))
+            .filter(a => a.offsetParent !== null);
+        return links.find(a => a.textContent.includes('下一頁'))
+            || links.find(a => a.textContent.trim() === '>')
+            || links.find(a => a.className.includes('next'))
+            || null;
+    """
     
-    def __init__(self, headless: bool = True, wait_seconds: int = 30, max_retries: int = 3):
+    def __init__(self, headless: bool = True, wait_seconds: int = 30, max_retries: int = 3,
+                 reuse_driver: bool = False):
         self.headless = headless
+        # Keep Chrome alive after close_driver() for another scrape in this process
+        self.reuse_driver = reuse_driver
         self.wait_seconds = wait_seconds
         self.max_retries = max_retries
         self.driver = None
@@ -35,9 +69,14 @@ class ProcurementScraper:
         self.current_list_url = None
         
     def setup_driver(self):
-        """Initialize Chrome WebDriver with cloud-optimized settings."""
+        """Initialize Chrome WebDriver, reusing a kept-alive browser with the same options."""
         print("Initializing Chrome WebDriver...")
-        
+        self.driver = get_cached_driver(self._chrome_options(), self._launch_driver)
+        self.wait = WebDriverWait(self.driver, self.wait_seconds)
+        print("✓ Chrome WebDriver initialized")
+    
+    def _chrome_options(self) -> Options:
+        """Chrome launch options with cloud-optimized settings."""
         chrome_options = Options()
         if self.headless:
             chrome_options.add_argument('--headless=new')
@@ -47,51 +86,66 @@ class ProcurementScraper:
         chrome_options.add_argument('--window-size=1920,1080')
         chrome_options.add_argument('--disable-extensions')
         chrome_options.add_argument('--disable-infobars')
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+        for arg in LEAN_CHROME_ARGS:
+            chrome_options.add_argument(arg)
+        chrome_options.add_argument(f'user-agent={self.USER_AGENT}')
+        # 不載入圖片、樣式與字型，只需要 DOM 文字
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.managed_default_content_settings.stylesheets': 2,
+            'profile.managed_default_content_settings.fonts': 2,
+        })
         # 增加頁面載入超時設定
         chrome_options.page_load_strategy = 'normal'
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        return chrome_options
+    
+    def _launch_driver(self, chrome_options: Options) -> webdriver.Chrome:
+        """Start a new Chrome instance."""
+        service = Service(get_driver_path())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
         # 設定頁面載入超時時間
-        self.driver.set_page_load_timeout(60)
-        self.driver.set_script_timeout(60)
-        self.wait = WebDriverWait(self.driver, self.wait_seconds)
-        
-        print("✓ Chrome WebDriver initialized")
+        driver.set_page_load_timeout(60)
+        driver.set_script_timeout(60)
+        return driver
         
+    def _release_page_state(self):
+        """Stop pending loads and drop cookies so the next list starts clean."""
+        try:
+            self.driver.execute_script("window.stop();")
+            self.driver.delete_all_cookies()
+        except WebDriverException as e:
+            print(f"  ⚠ Failed to release page state: {e}")
+    
+    def _reclaim_browser_memory(self):
+        """Clear the HTTP cache and force a Blink GC without restarting Chrome."""
+        try:
+            self.driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            self.driver.execute_cdp_cmd('HeapProfiler.collectGarbage', {})
+        except WebDriverException as e:
+            print(f"  ⚠ Failed to reclaim browser memory: {e}")
+    
     def close_driver(self):
+        """Close the browser, or keep it alive for the next scrape if reuse_driver is set."""
         if self.driver:
-            self.driver.quit()
+            release_driver(self.driver, keep_alive=self.reuse_driver)
             self.driver = None
+            self.wait = None
             print("✓ Browser closed")
     
-    def find_data_table(self):
-        """Find the data table on the page."""
-        try:
-            try:
-                container = self.driver.find_element(By.ID, "ContentPlaceHolder1_ListView1")
-                table = container.find_element(By.CSS_SELECTOR, "table.table-rwd")
-                headers = table.find_elements(By.TAG_NAME, "th")
-                header_texts = [h.text.strip() for h in headers]
-                if any(keyword in "".join(header_texts) for keyword in ["案件名稱", "公告機關", "案件編號"]):
-                    return table
-            except:
-                pass
-            
-            tables = self.driver.find_elements(By.TAG_NAME, 'table')
-            for table in tables:
-                table_class = table.get_attribute('class')
-                if 'table-rwd' in str(table_class):
-                    try:
-                        headers = table.find_elements(By.TAG_NAME, "th")
-                        header_texts = [h.text.strip() for h in headers]
-                        if any(keyword in "".join(header_texts) for keyword in ["案件名稱", "公告機關", "案件編號"]):
-                            return table
-                    except:
-                        continue
-        except:
-            pass
+    def find_data_table(self, soup: BeautifulSoup):
+        """Find the data table in the parsed page."""
+        container = soup.find(id="ContentPlaceHolder1_ListView1")
+        candidates = self.TABLE_SELECTOR.select(container) if container else []
+        candidates += self.TABLE_SELECTOR.select(soup)
+        
+        for table in candidates:
+            header_texts = "".join(th.get_text(strip=True) for th in table.find_all("th"))
+            if any(keyword in header_texts for keyword in self.TABLE_KEYWORDS):
+                return table
         return None
 
     def _load_page_with_retry(self, url: str, page_type: str) -> bool:
@@ -115,8 +169,14 @@ class ProcurementScraper:
                     time.sleep(5)
         return False
 
-    def scrape_list_page(self, url: str, page_type: str, max_pages: int = 50) -> List[Dict]:
-        """Scrape a list page (announce or registered)."""
+    def scrape_list_page(self, url: str, page_type: str, max_pages: int = 50,
+                         on_record: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Scrape a list page (announce or registered).
+        
+        If on_record is given, each record is passed to it as soon as its page
+        is parsed instead of being collected, and an empty list is returned.
+        """
         if not self.driver:
             raise RuntimeError("Driver not initialized")
             
@@ -128,53 +188,223 @@ class ProcurementScraper:
         
         self.current_list_url = url
         
+        # Selenium only loads the first page; ASP.NET pager postbacks are then
+        # replayed over HTTP with the browser's cookies and form state.
+        session = None
+        html, page_url = self.driver.page_source, self.driver.current_url
+        
         all_items = []
+        seen_keys = set()
+        prefetched = deque()
+        total_records = 0
         page_index = 1
+        browser_page = 1  # page the browser itself is showing
+        http_failed = False  # after an HTTP page failure, page on in the browser
         
         while page_index <= max_pages:
             print(f"\n  📄 Parsing page {page_index}...")
             
-            table = self.find_data_table()
+            soup = BeautifulSoup(html, _HTML_PARSER)
+            table = self.find_data_table(soup)
             if not table:
                 print("  ⚠ Data table not found")
                 break
             
-            rows = table.find_elements(By.TAG_NAME, "tr")
             page_items = []
+            scraped_at = datetime.now().isoformat()
             
-            for row_index, row in enumerate(rows):
-                if row_index == 0:  # Skip header
-                    continue
-                    
-                try:
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    if len(cells) < 4:
-                        continue
-                    
-                    # Extract basic info
-                    item = self._parse_row(cells, page_type)
-                    if item:
-                        page_items.append(item)
-                        
-                except Exception as e:
+            for row in table.find_all("tr")[1:]:  # Skip header
+                cells = row.find_all("td")
+                if len(cells) < 4:
                     continue
+                
+                # Extract basic info
+                item = self._parse_row(cells, page_type, scraped_at)
+                if item:
+                    page_items.append(item)
             
             if not page_items:
                 print("  ⚠ No items found on this page")
                 break
+            
+            # Drop rows already seen on earlier pages (postback paging can repeat a page)
+            parsed_count = len(page_items)
+            page_items = [item for item in page_items if self._is_new_record(item, seen_keys)]
+            if not page_items:
+                print("  ⚠ Page only repeats earlier records, stopping")
+                break
+            if len(page_items) < parsed_count:
+                print(f"  ⚠ Skipped {parsed_count - len(page_items)} duplicate rows")
                 
-            all_items.extend(page_items)
-            print(f"  ✓ Found {len(page_items)} items, total: {len(all_items)}")
+            total_records += len(page_items)
+            if on_record:
+                for item in page_items:
+                    on_record(item)
+            else:
+                all_items.extend(page_items)
+            print(f"  ✓ Found {len(page_items)} items, total: {total_records}")
+            
+            # The pager's numbered postbacks are independent of each other, so
+            # fetch the visible window of pages concurrently
+            if not prefetched and not http_failed:
+                page_requests = self._find_numbered_page_requests(soup, page_url, page_index, max_pages)
+                if len(page_requests) > 1:
+                    session = session or self._build_http_session()
+                    print(f"  ⚡ Fetching pages {page_index + 1}-{page_index + len(page_requests)} concurrently")
+                    pages = self._fetch_pages(session, page_requests)
+                    http_failed = len(pages) < len(page_requests)
+                    prefetched.extend(pages)
             
             # Try to go to next page
-            if not self._go_to_next_page():
+            next_page = None
+            if prefetched:
+                next_page = prefetched.popleft()
+            elif not http_failed and (next_request := self._find_next_page_request(soup, page_url)):
+                session = session or self._build_http_session()
+                try:
+                    next_page = self._fetch_page(session, *next_request)
+                except requests.RequestException as e:
+                    print(f"  ⚠ Next page request failed: {e}")
+                    http_failed = True
+            
+            if next_page is None and (http_failed or session is None):
+                # Page on in the browser; after HTTP pages it first walks up to the last good one
+                if browser_page < page_index:
+                    print(f"  ↪ Continuing in the browser from page {page_index}")
+                while browser_page <= page_index and self._go_to_next_page():
+                    browser_page += 1
+                if browser_page == page_index + 1:
+                    next_page = self.driver.page_source, self.driver.current_url
+            
+            if next_page is None:
                 break
+            html, page_url = next_page
             page_index += 1
         
         return all_items
     
-    def _parse_row(self, cells, page_type: str) -> Optional[Dict]:
-        """Parse a single row from the table."""
+    def _build_http_session(self) -> requests.Session:
+        """Create an HTTP session that shares the browser's cookies."""
+        session = requests.Session()
+        session.headers["User-Agent"] = self.USER_AGENT
+        for cookie in self.driver.get_cookies():
+            session.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain"), path=cookie.get("path", "/"),
+            )
+        return session
+    
+    def _find_next_page_request(self, soup: BeautifulSoup, page_url: str) -> Optional[tuple]:
+        """
+        Resolve the pager's next link into an HTTP request.
+        
+        Returns:
+            (url, form_data) where form_data is None for a plain GET link,
+            or None if there is no usable next link
+        """
+        next_link = None
+        for matches in (
+            lambda a: "下一頁" in a.get_text(),
+            lambda a: a.get_text(strip=True) == ">",  # not the ">>" last-page link
+            lambda a: "next" in " ".join(a.get("class", [])),
+        ):
+            next_link = next((a for a in soup.find_all("a") if matches(a)), None)
+            if next_link:
+                break
+        
+        return self._link_request(next_link, soup, page_url) if next_link else None
+    
+    def _find_numbered_page_requests(self, soup: BeautifulSoup, page_url: str,
+                                     current_page: int, last_page: int) -> List[tuple]:
+        """
+        Resolve the pager's numbered postback links after current_page.
+        
+        Returns:
+            Requests for pages current_page+1, current_page+2, ... (consecutive,
+            at most up to last_page) in page order
+        """
+        requests_by_page = {}
+        for link in soup.find_all("a", href=True):
+            postback = self.POSTBACK_RE.search(link["href"])
+            page_arg = self.PAGE_ARG_RE.match(postback.group(2)) if postback else None
+            if not page_arg:
+                continue
+            page = int(page_arg.group(1))
+            if current_page < page <= last_page and page not in requests_by_page:
+                request = self._link_request(link, soup, page_url)
+                if request:
+                    requests_by_page[page] = request
+        
+        page_requests = []
+        while current_page + len(page_requests) + 1 in requests_by_page:
+            page_requests.append(requests_by_page[current_page + len(page_requests) + 1])
+        return page_requests
+    
+    def _link_request(self, link, soup: BeautifulSoup, page_url: str) -> Optional[tuple]:
+        """Turn a pager link into (url, form_data), or None if it is not followable."""
+        # Disabled ASP.NET pager links are rendered without an href
+        href = link.get("href")
+        if not href:
+            return None
+        
+        postback = self.POSTBACK_RE.search(href)
+        if postback:
+            form = link.find_parent("form") or soup.find("form")
+            if not form:
+                return None
+            form_data = self._collect_form_fields(form)
+            form_data["__EVENTTARGET"], form_data["__EVENTARGUMENT"] = postback.groups()
+            return urljoin(page_url, form.get("action") or page_url), form_data
+        
+        if href.lower().startswith("javascript"):
+            return None
+        return urljoin(page_url, href), None
+    
+    @staticmethod
+    def _collect_form_fields(form) -> Dict[str, str]:
+        """Collect the values a browser would submit with the form (incl. __VIEWSTATE)."""
+        fields = {}
+        for field in form.find_all("input"):
+            name = field.get("name")
+            if not name or field.get("type", "text").lower() in ("submit", "button", "image", "checkbox", "radio"):
+                continue
+            fields[name] = field.get("value", "")
+        for field in form.find_all("input", type=["checkbox", "radio"]):
+            if field.get("name") and field.has_attr("checked"):
+                fields[field["name"]] = field.get("value", "on")
+        for select in form.find_all("select"):
+            if not select.get("name"):
+                continue
+            option = select.find("option", selected=True) or select.find("option")
+            if option:
+                fields[select["name"]] = option.get("value", option.get_text(strip=True))
+        return fields
+    
+    def _fetch_page(self, session: requests.Session, url: str,
+                    form_data: Optional[Dict[str, str]]) -> tuple:
+        """Fetch a list page (GET, or POST for a postback) and return (html, url)."""
+        if form_data is None:
+            response = session.get(url, timeout=self.wait_seconds)
+        else:
+            response = session.post(url, data=form_data, timeout=self.wait_seconds)
+        response.raise_for_status()
+        return response.content, response.url
+    
+    def _fetch_pages(self, session: requests.Session, page_requests: List[tuple]) -> List[tuple]:
+        """Fetch list pages concurrently; returns (html, url) in page order up to the first failure."""
+        pages = []
+        with ThreadPoolExecutor(max_workers=self.PAGE_FETCH_WORKERS) as executor:
+            futures = [executor.submit(self._fetch_page, session, *request) for request in page_requests]
+            for future in futures:
+                try:
+                    pages.append(future.result())
+                except requests.RequestException as e:
+                    print(f"  ⚠ Page request failed: {e}")
+                    break
+        return pages
+    
+    def _parse_row(self, cells, page_type: str, scraped_at: str) -> Optional[Dict]:
+        """Parse a single row from the table; scraped_at is the page's scrape time."""
         try:
             # Find the link element for case name
             link = None
@@ -182,22 +412,20 @@ class ProcurementScraper:
             detail_url = ""
             
             for cell in cells:
-                try:
-                    link = cell.find_element(By.TAG_NAME, "a")
-                    case_name = link.text.strip()
-                    href = link.get_attribute("href")
+                link = cell.find("a")
+                if link:
+                    case_name = link.get_text(" ", strip=True)
+                    href = link.get("href")
                     if href:
                         detail_url = urljoin(self.BASE_URL, href)
                     break
-                except NoSuchElementException:
-                    continue
             
             if not case_name:
-                case_name = cells[0].text.strip() if cells else ""
+                case_name = cells[0].get_text(" ", strip=True) if cells else ""
             
-            # Extract other fields
-            agency = cells[1].text.strip() if len(cells) > 1 else ""
-            date_str = cells[2].text.strip() if len(cells) > 2 else ""
+            # Extract other fields; a space between text nodes, like Selenium's rendered .text
+            agency = cells[1].get_text(" ", strip=True) if len(cells) > 1 else ""
+            date_str = cells[2].get_text(" ", strip=True) if len(cells) > 2 else ""
             
             return {
                 "tenderName": case_name,
@@ -205,37 +433,56 @@ class ProcurementScraper:
                 "date": date_str,
                 "sourceUrl": detail_url,
                 "pageType": page_type,
-                "scrapedAt": datetime.now().isoformat(),
+                "scrapedAt": scraped_at,
             }
         except Exception as e:
             return None
     
+    @staticmethod
+    def _is_new_record(item: Dict, seen_keys: set) -> bool:
+        """Record the item's key in seen_keys; False if it was already there."""
+        # Links may be per-row postbacks that repeat across pages, so key on the row text too
+        key = (item["agency"], item["tenderName"], item["date"], item["sourceUrl"])
+        if key in seen_keys:
+            return False
+        seen_keys.add(key)
+        return True
+    
     def _go_to_next_page(self) -> bool:
         """Try to navigate to the next page."""
         try:
-            # Look for next page link
-            next_selectors = [
-                "//a[contains(text(), '下一頁')]",
-                "//a[contains(text(), '>')]",
-                "//a[contains(@class, 'next')]",
-            ]
-            
-            for selector in next_selectors:
-                try:
-                    next_link = self.driver.find_element(By.XPATH, selector)
-                    if next_link.is_displayed():
-                        next_link.click()
-                        time.sleep(1)
-                        self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "table")))
-                        return True
-                except:
-                    continue
+            # Find the first visible next-page link in a single DOM pass
+            next_link = self.driver.execute_script(self.FIND_NEXT_LINK_JS)
+            if next_link is None:
+                return False
             
+            # Wait for the data table itself to be replaced instead of sleeping blindly;
+            # this covers both full postbacks and partial (UpdatePanel) refreshes
+            old_table = self._find_data_table_element()
+            if old_table is None:
+                print("  ⚠ Data table not found, cannot page")
+                return False
+            self.driver.execute_script("arguments[0].click();", next_link)
+            self.wait.until(EC.staleness_of(old_table))
+            self.wait.until(lambda d: self._find_data_table_element())
+            return True
+        except TimeoutException:
+            print("  ⚠ Timed out waiting for the next page's data table")
             return False
-        except:
+        except WebDriverException:
             return False
     
-    def scrape_all(self, max_pages: int = 50) -> Dict[str, Any]:
+    def _find_data_table_element(self):
+        """Locate the live data table in the browser, by the same rules as find_data_table."""
+        for selector in (f"#ContentPlaceHolder1_ListView1 {self.TABLE_CSS}", self.TABLE_CSS):
+            for table in self.driver.find_elements(By.CSS_SELECTOR, selector):
+                header_texts = "".join(th.text for th in table.find_elements(By.TAG_NAME, "th"))
+                if any(keyword in header_texts for keyword in self.TABLE_KEYWORDS):
+                    return table
+        return None
+    
+    def scrape_all(self, max_pages: int = 50,
+                   on_record: Optional[Callable[[Dict], None]] = None) -> Dict[str, Any]:
         """Scrape both announce and registered lists."""
         try:
             self.setup_driver()
@@ -246,41 +493,49 @@ class ProcurementScraper:
             print("\n" + "=" * 50)
             print("Scraping ANNOUNCE list...")
             print("=" * 50)
-            announce_items = self.scrape_list_page(self.ANNOUNCE_URL, "announce", max_pages)
+            announce_items = self.scrape_list_page(self.ANNOUNCE_URL, "announce", max_pages, on_record)
             all_data.extend(announce_items)
+            self._release_page_state()
+            self._reclaim_browser_memory()
             
             # Scrape registered list
             print("\n" + "=" * 50)
             print("Scraping REGISTERED list...")
             print("=" * 50)
-            registered_items = self.scrape_list_page(self.REGISTERED_URL, "registered", max_pages)
+            registered_items = self.scrape_list_page(self.REGISTERED_URL, "registered", max_pages, on_record)
             all_data.extend(registered_items)
+            self._release_page_state()
             
             return self._build_result(all_data)
             
         finally:
             self.close_driver()
+            gc.collect()
     
     def _build_result(self, records: List[Dict]) -> Dict[str, Any]:
         """Build the final result structure."""
-        unique_agencies = {item.get("agency") for item in records if item.get("agency")}
+        # Single pass, one dict lookup per record
+        unique_agencies = {agency for item in records if (agency := item.get("agency"))}
+        total_records = len(records)
         
         return {
             "crawlerId": "ppp-mof",
             "runAt": datetime.now().isoformat(),
             "stats": {
-                "totalRecords": len(records),
+                "totalRecords": total_records,
                 "totalAgencies": len(unique_agencies),
             },
-            "totalRecords": len(records),
+            "totalRecords": total_records,
             "data": records,
         }
 
 
-def run_procurement_scraper(max_pages: int = 50) -> Dict[str, Any]:
-    """Run the procurement scraper and return results."""
-    scraper = ProcurementScraper(headless=True)
-    return scraper.scrape_all(max_pages=max_pages)
+def run_procurement_scraper(max_pages: int = 50,
+                            on_record: Optional[Callable[[Dict], None]] = None,
+                            reuse_driver: bool = False) -> Dict[str, Any]:
+    """Run the procurement scraper and return results (reuse_driver keeps Chrome alive afterwards)."""
+    scraper = ProcurementScraper(headless=True, reuse_driver=reuse_driver)
+    return scraper.scrape_all(max_pages=max_pages, on_record=on_record)
 
 
 if __name__ == "__main__":
@@ -3,23 +3,39 @@ Public Read Scraper - Cloud optimized version
 Scrapes public read tender data from government procurement website.
 """
 
+import gc
 import json
 import re
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
+import soupsieve
 from bs4 import BeautifulSoup
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select, WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+
+from .chromedriver import (
+    BLOCKED_URLS, LEAN_CHROME_ARGS, get_cached_driver, get_driver_path, release_driver,
+)
+
+try:
+    import lxml  # noqa: F401  (C parser, several times faster than html.parser)
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+_WS_RE = re.compile(r"\s+")
+_PERIOD_SEP_RE = re.compile(r"[-至－─~]+")
+# Compiled once instead of on every select() call
+_ROW_SELECTOR = soupsieve.compile("#tpRead tbody tr")
 
 
 class PublicReadScraper:
@@ -27,16 +43,25 @@ class PublicReadScraper:
 
     BASE_URL = "https://web.pcc.gov.tw"
     LIST_URL = f"{BASE_URL}/pis/"
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 
-    def __init__(self, headless: bool = True, wait_seconds: int = 20):
+    def __init__(self, headless: bool = True, wait_seconds: int = 20, reuse_driver: bool = False):
         self.headless = headless
+        # Keep Chrome alive after close_driver() for another scrape in this process
+        self.reuse_driver = reuse_driver
         self.wait_seconds = wait_seconds
         self.driver = None
         self.wait = None
 
     def setup_driver(self):
-        """Initialize Chrome WebDriver."""
+        """Initialize Chrome WebDriver, reusing a kept-alive browser with the same options."""
         print("Initializing Chrome WebDriver...")
+        self.driver = get_cached_driver(self._chrome_options(), self._launch_driver)
+        self.wait = WebDriverWait(self.driver, self.wait_seconds)
+        print("✓ Chrome WebDriver initialized")
+
+    def _chrome_options(self) -> Options:
+        """Chrome launch options."""
         chrome_options = Options()
         if self.headless:
             chrome_options.add_argument("--headless=new")
@@ -45,28 +70,45 @@ class PublicReadScraper:
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--lang=zh-TW")
-        chrome_options.add_argument(
-            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        )
-
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, self.wait_seconds)
-        print("✓ Chrome WebDriver initialized")
+        for arg in LEAN_CHROME_ARGS:
+            chrome_options.add_argument(arg)
+        chrome_options.add_argument(f"user-agent={self.USER_AGENT}")
+        # Only DOM text is needed: skip images, stylesheets and web fonts
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.stylesheets": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        })
+
+        return chrome_options
+
+    def _launch_driver(self, chrome_options: Options) -> webdriver.Chrome:
+        """Start a new Chrome instance."""
+        service = Service(get_driver_path())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+        return driver
 
     def close_driver(self):
-        """Close the browser."""
+        """Close the browser, or keep it alive for the next scrape if reuse_driver is set."""
         if self.driver:
-            self.driver.quit()
+            release_driver(self.driver, keep_alive=self.reuse_driver)
             self.driver = None
+            self.wait = None
         print("✓ Browser closed")
 
     def scrape_public_read(
         self,
         max_pages: Optional[int] = None,
+        on_record: Optional[Callable[[Dict], None]] = None,
     ) -> List[Dict]:
         """
         Main flow: execute query and auto-paginate.
+
+        If on_record is given, each record is passed to it as soon as its page
+        is parsed instead of being collected, and an empty list is returned.
         """
         if not self.driver or not self.wait:
             raise RuntimeError("Please call setup_driver() first")
@@ -76,31 +118,65 @@ class PublicReadScraper:
         self._trigger_search()
 
         all_items: List[Dict] = []
+        seen_keys = set()
+        total_records = 0
         page_index = 1
         max_pages = max_pages or 100
 
+        # Selenium is only needed for the JS-driven search; later pages are
+        # fetched over HTTP with the browser's cookies whenever the pager has real links.
+        session = None
+        html, page_url = self.driver.page_source, self.driver.current_url
+
         while page_index <= max_pages:
             print(f"\n📄 Parsing page {page_index}...")
-            page_items = self._parse_current_page()
+            soup = BeautifulSoup(html, _HTML_PARSER)
+            page_items = self._parse_page(soup)
             
             if not page_items:
                 print("  ⚠ No data on this page, stopping.")
                 break
 
-            all_items.extend(page_items)
-            print(f"  ✓ Found {len(page_items)} items, total: {len(all_items)}")
+            # Drop rows already seen on earlier pages (pager glitches repeat pages)
+            parsed_count = len(page_items)
+            page_items = [item for item in page_items if self._is_new_record(item, seen_keys)]
+            if not page_items:
+                print("  ⚠ Page only repeats earlier records, stopping.")
+                break
+            if len(page_items) < parsed_count:
+                print(f"  ⚠ Skipped {parsed_count - len(page_items)} duplicate rows")
+
+            total_records += len(page_items)
+            if on_record:
+                for item in page_items:
+                    on_record(item)
+            else:
+                all_items.extend(page_items)
+            print(f"  ✓ Found {len(page_items)} items, total: {total_records}")
 
             if page_index >= max_pages:
                 print(f"⚠ Reached max pages limit: {max_pages}")
                 break
 
-            if self._go_to_next_page():
-                page_index += 1
+            next_url = self._find_next_page_url(soup, page_url)
+            if next_url:
+                session = session or self._build_http_session()
+                try:
+                    html, page_url = self._fetch_page(session, next_url)
+                except requests.RequestException as exc:
+                    # Keep what was collected: retry this page in the browser, else stop
+                    print(f"  ✗ Page request failed: {exc}")
+                    if not self._open_page_in_browser(next_url):
+                        break
+                    html, page_url = self.driver.page_source, self.driver.current_url
+            elif session is None and self._go_to_next_page():
+                html, page_url = self.driver.page_source, self.driver.current_url
             else:
                 print("  ✓ Reached last page")
                 break
+            page_index += 1
 
-        print(f"\n✅ Complete, total records: {len(all_items)}")
+        print(f"\n✅ Complete, total records: {total_records}")
         return all_items
 
     def _open_search_page(self):
@@ -170,23 +246,52 @@ class PublicReadScraper:
 
         print("  ✓ Search results loaded")
 
-    def _parse_current_page(self) -> List[Dict]:
-        """Parse current page data."""
-        rows = self.driver.find_elements(By.CSS_SELECTOR, "#tpRead tbody tr")
+    def _build_http_session(self) -> requests.Session:
+        """Create an HTTP session that shares the browser's search session cookies."""
+        session = requests.Session()
+        session.headers["User-Agent"] = self.USER_AGENT
+        for cookie in self.driver.get_cookies():
+            session.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain"), path=cookie.get("path", "/"),
+            )
+        return session
+
+    def _fetch_page(self, session: requests.Session, url: str) -> Tuple[bytes, str]:
+        """GET a result page and return its raw HTML and final URL."""
+        response = session.get(url, timeout=self.wait_seconds)
+        response.raise_for_status()
+        return response.content, response.url
+
+    def _find_next_page_url(self, soup: BeautifulSoup, page_url: str) -> Optional[str]:
+        """Return the next-page URL if the pager links to it directly."""
+        pagelinks = soup.find(id="pagelinks")
+        if not pagelinks:
+            return None
+        for link in pagelinks.find_all("a"):
+            href = link.get("href")
+            if "下一頁" in link.get_text() and href and not href.lower().startswith("javascript"):
+                return urljoin(page_url, href)
+        return None
+
+    def _parse_page(self, soup: BeautifulSoup) -> List[Dict]:
+        """Parse result rows from a page's HTML."""
+        rows = _ROW_SELECTOR.select(soup)
         results: List[Dict] = []
+        scraped_at = datetime.now().isoformat()
 
         for row in rows:
             try:
-                cols = row.find_elements(By.TAG_NAME, "td")
+                cols = row.find_all("td")
                 if len(cols) < 7:
                     continue
 
-                seq = cols[0].text.strip()
-                agency = cols[1].text.strip()
-                tender_id = cols[2].text.strip()
-                tender_name = cols[3].text.strip()
-                announcement_count = cols[4].text.strip()
-                period_text = cols[5].text.strip()
+                seq = cols[0].get_text(" ", strip=True)
+                agency = cols[1].get_text(" ", strip=True)
+                tender_id = cols[2].get_text(" ", strip=True)
+                tender_name = cols[3].get_text(" ", strip=True)
+                announcement_count = cols[4].get_text(" ", strip=True)
+                period_text = cols[5].get_text(" ", strip=True)
                 period_start, period_end = self._parse_period(period_text)
 
                 detail_url = self._extract_link_from_cell(cols[6]) or self._extract_link_from_cell(cols[2])
@@ -201,7 +306,7 @@ class PublicReadScraper:
                     "public_read_end": period_end,
                     "period_raw": period_text,
                     "sourceUrl": detail_url,
-                    "scrapedAt": datetime.now().isoformat(),
+                    "scrapedAt": scraped_at,
                 }
 
                 results.append(basic_info)
@@ -211,6 +316,17 @@ class PublicReadScraper:
 
         return results
 
+    def _open_page_in_browser(self, url: str) -> bool:
+        """Load a result page with Selenium (fallback when the HTTP request fails)."""
+        print("  → Retrying page in browser")
+        try:
+            self.driver.get(url)
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#tpRead tbody tr")))
+            return True
+        except WebDriverException as exc:
+            print(f"  ✗ Browser navigation failed: {exc}")
+            return False
+
     def _go_to_next_page(self) -> bool:
         """Navigate to next page."""
         try:
@@ -234,55 +350,74 @@ class PublicReadScraper:
 
     def _extract_link_from_cell(self, cell) -> Optional[str]:
         """Extract link from cell."""
-        try:
-            link = cell.find_element(By.TAG_NAME, "a")
-            href = link.get_attribute("href")
-            if href and not href.lower().startswith("javascript"):
-                return urljoin(self.BASE_URL, href)
-        except NoSuchElementException:
-            return None
+        link = cell.find("a")
+        href = link.get("href") if link else None
+        if href and not href.lower().startswith("javascript"):
+            return urljoin(self.BASE_URL, href)
         return None
 
+    @staticmethod
+    def _is_new_record(item: Dict, seen_keys: set) -> bool:
+        """Record the item's key in seen_keys; False if it was already there."""
+        if item["tenderId"]:
+            key = (item["tenderId"], item["announcement_count"])
+        else:
+            key = (item["agency"], item["tenderName"], item["period_raw"])
+        if key in seen_keys:
+            return False
+        seen_keys.add(key)
+        return True
+
     @staticmethod
     def _parse_period(period_text: str) -> tuple:
         """Parse period text into start and end dates."""
         if not period_text:
             return None, None
-        normalized = period_text.replace("－", "-").replace("─", "-").replace("~", "-")
-        normalized = re.sub(r"\s+", "", normalized)
-        parts = re.split(r"[-至]+", normalized)
+        normalized = _WS_RE.sub("", period_text)
+        parts = _PERIOD_SEP_RE.split(normalized)
         if len(parts) >= 2:
             return parts[0] or None, parts[1] or None
         return normalized or None, None
 
-    def scrape_all(self, max_pages: Optional[int] = None) -> Dict[str, Any]:
+    def scrape_all(
+        self,
+        max_pages: Optional[int] = None,
+        on_record: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict[str, Any]:
         """Run the scraper and return structured results."""
         try:
             self.setup_driver()
-            records = self.scrape_public_read(max_pages=max_pages)
+            records = self.scrape_public_read(max_pages=max_pages, on_record=on_record)
             return self._build_result(records)
         finally:
             self.close_driver()
+            gc.collect()
 
     def _build_result(self, records: List[Dict]) -> Dict[str, Any]:
         """Build final result structure."""
-        unique_agencies = {item.get("agency") for item in records if item.get("agency")}
+        # Single pass, one dict lookup per record
+        unique_agencies = {agency for item in records if (agency := item.get("agency"))}
+        total_records = len(records)
         return {
             "crawlerId": "public-read",
             "runAt": datetime.now().isoformat(),
             "stats": {
-                "totalRecords": len(records),
+                "totalRecords": total_records,
                 "totalAgencies": len(unique_agencies),
             },
-            "totalRecords": len(records),
+            "totalRecords": total_records,
             "data": records,
         }
 
 
-def run_public_read_scraper(max_pages: Optional[int] = None) -> Dict[str, Any]:
-    """Run the public read scraper and return results."""
-    scraper = PublicReadScraper(headless=True)
-    return scraper.scrape_all(max_pages=max_pages)
+def run_public_read_scraper(
+    max_pages: Optional[int] = None,
+    on_record: Optional[Callable[[Dict], None]] = None,
+    reuse_driver: bool = False,
+) -> Dict[str, Any]:
+    """Run the public read scraper and return results (reuse_driver keeps Chrome alive afterwards)."""
+    scraper = PublicReadScraper(headless=True, reuse_driver=reuse_driver)
+    return scraper.scrape_all(max_pages=max_pages, on_record=on_record)
 
 
 if __name__ == "__main__":
@@ -3,20 +3,45 @@ Tender Announcement Scraper - Cloud optimized version
 Scrapes tender announcements from government procurement website.
 """
 
+import gc
 import json
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin
 
+import requests
+import soupsieve
+from bs4 import BeautifulSoup, Comment, NavigableString
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+
+from .chromedriver import (
+    BLOCKED_URLS, LEAN_CHROME_ARGS, get_cached_driver, get_driver_path, release_driver,
+)
+
+try:
+    import lxml  # noqa: F401  (C parser, several times faster than html.parser)
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+_PAGE_PARAM_RE = re.compile(r"([?&]d-49738-p=)\d+")
+_TOTAL_PAGES_RE = re.compile(r"共\s*(\d+)\s*頁")
+# Compiled once instead of on every select() call
+_ROW_SELECTOR = soupsieve.compile("#tpam tbody tr")
+# The 檢視 link with a real (non-javascript:) href, matched in one query
+_DETAIL_LINK_SELECTOR = soupsieve.compile(
+    "a[href]:not([href^='javascript' i]):-soup-contains('檢視')"
+)
 
 
 class TenderScraper:
@@ -24,16 +49,29 @@ class TenderScraper:
 
     BASE_URL = "https://web.pcc.gov.tw"
     RESULT_URL = f"{BASE_URL}/prkms/tender/common/basic/readTenderBasic"
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    PAGE_FETCH_WORKERS = 8
+    PAGE_RETRIES = 3  # HTTP attempts per result page before falling back to the browser
 
-    def __init__(self, headless: bool = True, wait_seconds: int = 20):
+    def __init__(self, headless: bool = True, wait_seconds: int = 20, reuse_driver: bool = False):
         self.headless = headless
+        # Keep Chrome alive after close_driver() for another scrape in this process
+        self.reuse_driver = reuse_driver
         self.wait_seconds = wait_seconds
         self.driver = None
         self.wait = None
+        # Page fetch workers share the one browser for their fallback loads
+        self._driver_lock = threading.Lock()
 
     def setup_driver(self):
-        """Initialize Chrome WebDriver."""
+        """Initialize Chrome WebDriver, reusing a kept-alive browser with the same options."""
         print("Initializing Chrome WebDriver...")
+        self.driver = get_cached_driver(self._chrome_options(), self._launch_driver)
+        self.wait = WebDriverWait(self.driver, self.wait_seconds)
+        print("✓ Chrome WebDriver initialized")
+
+    def _chrome_options(self) -> Options:
+        """Chrome launch options."""
         chrome_options = Options()
         if self.headless:
             chrome_options.add_argument("--headless=new")
@@ -42,29 +80,50 @@ class TenderScraper:
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--lang=zh-TW")
-        chrome_options.add_argument(
-            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        )
-
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, self.wait_seconds)
-        print("✓ Chrome WebDriver initialized")
+        chrome_options.add_argument("--disable-extensions")
+        for arg in LEAN_CHROME_ARGS:
+            chrome_options.add_argument(arg)
+        chrome_options.add_argument(f"user-agent={self.USER_AGENT}")
+        # Only the server-rendered table text is read: skip images, styles, fonts and plugins
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.stylesheets": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+            "profile.managed_default_content_settings.plugins": 2,
+        })
+        # Return from driver.get() at DOMContentLoaded; the waits cover the results table
+        chrome_options.page_load_strategy = "eager"
+
+        return chrome_options
+
+    def _launch_driver(self, chrome_options: Options) -> webdriver.Chrome:
+        """Start a new Chrome instance."""
+        service = Service(get_driver_path())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+        return driver
 
     def close_driver(self):
-        """Close the browser."""
+        """Close the browser, or keep it alive for the next scrape if reuse_driver is set."""
         if self.driver:
-            self.driver.quit()
+            release_driver(self.driver, keep_alive=self.reuse_driver)
             self.driver = None
+            self.wait = None
         print("✓ Browser closed")
 
     def scrape_tender_announcements(
         self,
         max_pages: Optional[int] = None,
         unlimited: bool = True,
+        on_record: Optional[Callable[[Dict], None]] = None,
     ) -> List[Dict]:
         """
         Main flow: execute query and auto-paginate.
+
+        If on_record is given, each record is passed to it as soon as its page
+        is parsed instead of being collected, and an empty list is returned.
         """
         if not self.driver or not self.wait:
             raise RuntimeError("Please call setup_driver() first")
@@ -72,41 +131,38 @@ class TenderScraper:
         self._trigger_search()
 
         all_items: List[Dict] = []
-        page_index = 1
+        total_records = 0
+        failed_pages = 0
         if not unlimited:
             max_pages = max_pages or 100
         else:
             max_pages = max_pages or float('inf')
 
-        consecutive_empty_pages = 0
-        max_consecutive_empty = 3
-
-        while page_index <= max_pages:
-            print(f"\n📄 Parsing page {page_index}...")
-            page_items = self._parse_current_page()
+        # _iter_pages bounds the walk (known page count, or the first empty page);
+        # None marks a page that could not be fetched over HTTP or in the browser
+        soup = BeautifulSoup(self.driver.page_source, _HTML_PARSER)
+        for page_index, page_items in self._iter_pages(soup, self.driver.current_url, max_pages):
+            print(f"\n📄 Page {page_index}")
 
+            if page_items is None:
+                print("  ✗ Page could not be fetched, its records are missing")
+                failed_pages += 1
+                continue
             if not page_items:
-                consecutive_empty_pages += 1
-                print(f"  ⚠ No data on this page (consecutive: {consecutive_empty_pages})")
-                if consecutive_empty_pages >= max_consecutive_empty:
-                    print(f"⚠ {max_consecutive_empty} consecutive empty pages, stopping.")
-                    break
-            else:
-                consecutive_empty_pages = 0
-                all_items.extend(page_items)
-                print(f"  ✓ Found {len(page_items)} items, total: {len(all_items)}")
-
-            if not unlimited and page_index >= max_pages:
-                print(f"⚠ Reached max pages limit: {max_pages}")
-                break
+                print("  ⚠ No data on this page")
+                continue
 
-            if self._go_to_next_page(page_index):
-                page_index += 1
+            total_records += len(page_items)
+            if on_record:
+                for item in page_items:
+                    on_record(item)
             else:
-                print("  ✓ Reached last page")
-                break
+                all_items.extend(page_items)
+            print(f"  ✓ Found {len(page_items)} items, total: {total_records}")
 
-        print(f"\n✅ Complete, total records: {len(all_items)}")
+        print(f"\n✅ Complete, total records: {total_records}")
+        if failed_pages:
+            print(f"⚠ {failed_pages} page(s) failed and were skipped")
         return all_items
 
     def _trigger_search(self):
@@ -158,33 +214,146 @@ class TenderScraper:
             except TimeoutException:
                 raise RuntimeError("Cannot find results table")
 
-    def _parse_current_page(self) -> List[Dict]:
-        """Parse current page data."""
-        rows = self.driver.find_elements(By.CSS_SELECTOR, "#tpam tbody tr")
+    def _iter_pages(self, soup: BeautifulSoup, page_url: str,
+                    max_pages: float) -> Iterator[Tuple[int, Optional[List[Dict]]]]:
+        """
+        Yield (page_index, records) for each result page, in page order.
+
+        Selenium only runs the search; the result table is server-rendered, so
+        later pages are plain GETs sharing the browser's cookies. When the pager
+        states the page count, those GETs run concurrently. Records are None for
+        a page that failed both over HTTP and in the browser.
+        """
+        yield 1, self._parse_page(soup)
+
+        session = self._build_http_session()
+        total_pages = self._detect_total_pages(soup)
+
+        if total_pages:
+            last_page = min(total_pages, max_pages)
+            if last_page < total_pages:
+                print(f"⚠ Reached max pages limit: {max_pages}")
+            print(f"  ⚡ {total_pages} pages, fetching pages 2-{last_page} "
+                  f"with {self.PAGE_FETCH_WORKERS} workers")
+            page_numbers = range(2, last_page + 1)
+            with ThreadPoolExecutor(max_workers=self.PAGE_FETCH_WORKERS) as executor:
+                results = executor.map(
+                    lambda page: self._fetch_and_parse(session, page_url, page), page_numbers
+                )
+                try:
+                    yield from zip(page_numbers, results)
+                finally:
+                    executor.shutdown(cancel_futures=True)
+            return
+
+        # Page count unknown: walk the pages one by one until one has no rows
+        page_index = 1
+        while page_index < max_pages:
+            next_page = page_index + 1
+            print(f"  → Going to page {next_page}")
+            soup = self._load_page(session, self._page_url(page_url, next_page))
+            if soup is None:
+                # Cannot tell a failure from the end of the list, so stop here
+                yield next_page, None
+                return
+
+            if not _ROW_SELECTOR.select_one(soup):
+                print("  ✓ Reached last page")
+                return
+            page_index = next_page
+            yield page_index, self._parse_page(soup)
+
+        print(f"⚠ Reached max pages limit: {max_pages}")
+
+    @staticmethod
+    def _detect_total_pages(soup: BeautifulSoup) -> Optional[int]:
+        """Read the page count from the pager's "共 N 頁" text."""
+        # The pager only links a window of pages, so its highest link is not the total
+        pager = soup.find(id="pagelinks")
+        match = _TOTAL_PAGES_RE.search(pager.get_text()) if pager else None
+        return int(match.group(1)) if match else None
+
+    def _fetch_and_parse(self, session: requests.Session, page_url: str,
+                         page: int) -> Optional[List[Dict]]:
+        """Fetch one result page and parse it; None if the page could not be fetched."""
+        soup = self._load_page(session, self._page_url(page_url, page))
+        return self._parse_page(soup) if soup is not None else None
+
+    def _load_page(self, session: requests.Session, url: str) -> Optional[BeautifulSoup]:
+        """GET a result page, retrying with backoff, then falling back to the browser."""
+        for attempt in range(1, self.PAGE_RETRIES + 1):
+            try:
+                html, _ = self._fetch_page(session, url)
+                return BeautifulSoup(html, _HTML_PARSER)
+            except requests.RequestException as exc:
+                print(f"  ⚠ Page request failed (attempt {attempt}/{self.PAGE_RETRIES}): {exc}")
+                if attempt < self.PAGE_RETRIES:
+                    time.sleep(2 ** attempt)
+
+        html = self._open_page_in_browser(url)
+        return BeautifulSoup(html, _HTML_PARSER) if html is not None else None
+
+    def _open_page_in_browser(self, url: str) -> Optional[str]:
+        """Load a result page with Selenium (fallback when HTTP keeps failing); returns its HTML."""
+        print("  → Retrying page in browser")
+        with self._driver_lock:  # WebDriver is not thread-safe
+            try:
+                self.driver.get(url)
+                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#tpam tbody tr")))
+                return self.driver.page_source
+            except WebDriverException as exc:
+                print(f"  ✗ Browser navigation failed: {exc}")
+                return None
+
+    def _build_http_session(self) -> requests.Session:
+        """Create an HTTP session that shares the browser's search session cookies."""
+        session = requests.Session()
+        session.headers["User-Agent"] = self.USER_AGENT
+        for cookie in self.driver.get_cookies():
+            session.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain"), path=cookie.get("path", "/"),
+            )
+        return session
+
+    def _fetch_page(self, session: requests.Session, url: str) -> Tuple[bytes, str]:
+        """GET a result page and return its raw HTML and final URL."""
+        response = session.get(url, timeout=self.wait_seconds)
+        response.raise_for_status()
+        return response.content, response.url
+
+    @staticmethod
+    def _page_url(url: str, page: int) -> str:
+        """Return url pointing at the given result page (displaytag d-49738-p parameter)."""
+        if _PAGE_PARAM_RE.search(url):
+            return _PAGE_PARAM_RE.sub(lambda m: f"{m.group(1)}{page}", url, count=1)
+        separator = "&" if "?" in url else "?"
+        return f"{url}{separator}d-49738-p={page}"
+
+    def _parse_page(self, soup: BeautifulSoup) -> List[Dict]:
+        """Parse result rows from a page's HTML."""
+        rows = _ROW_SELECTOR.select(soup)
         results: List[Dict] = []
+        scraped_at = datetime.now().isoformat()
 
         for row in rows:
-            cols = row.find_elements(By.TAG_NAME, "td")
+            cols = row.find_all("td")
             if len(cols) < 10:
                 continue
 
-            seq = cols[0].text.strip()
-            agency = cols[1].text.strip()
+            # A space between text nodes, like the rendered text Selenium used to read
+            seq = cols[0].get_text(" ", strip=True)
+            agency = cols[1].get_text(" ", strip=True)
 
-            case_info = cols[2].text.strip()
-            case_number = ""
-            case_name = case_info
-            if "\n" in case_info:
-                parts = case_info.split("\n", 1)
-                case_number = parts[0].strip()
-                case_name = parts[1].strip()
+            # Case number and name are separated by a line break
+            case_number, case_name = self._split_at_br(cols[2])
 
-            transmission_count = cols[3].text.strip()
-            tender_method = cols[4].text.strip()
-            procurement_type = cols[5].text.strip()
-            announcement_date = cols[6].text.strip()
-            deadline = cols[7].text.strip()
-            budget = cols[8].text.strip()
+            transmission_count = cols[3].get_text(" ", strip=True)
+            tender_method = cols[4].get_text(" ", strip=True)
+            procurement_type = cols[5].get_text(" ", strip=True)
+            announcement_date = cols[6].get_text(" ", strip=True)
+            deadline = cols[7].get_text(" ", strip=True)
+            budget = cols[8].get_text(" ", strip=True)
 
             detail_url = self._extract_detail_link(cols[9])
 
@@ -203,83 +372,77 @@ class TenderScraper:
                 "deadline": deadline,
                 "budget_amount": budget,
                 "sourceUrl": detail_url,
-                "scrapedAt": datetime.now().isoformat(),
+                "scrapedAt": scraped_at,
             }
 
             results.append(basic_info)
 
         return results
 
-    def _go_to_next_page(self, current_page: int) -> bool:
-        """Navigate to next page by modifying URL."""
-        try:
-            next_page = current_page + 1
-            current_url = self.driver.current_url
-
-            if "d-49738-p=" in current_url:
-                new_url = current_url.replace(f"d-49738-p={current_page}", f"d-49738-p={next_page}")
-            else:
-                if "?" in current_url:
-                    new_url = current_url + f"&d-49738-p={next_page}"
-                else:
-                    new_url = current_url + f"?d-49738-p={next_page}"
-
-            print(f"  → Going to page {next_page}")
-            self.driver.get(new_url)
-
-            try:
-                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "#tpam tbody tr")))
-                return True
-            except TimeoutException:
-                rows = self.driver.find_elements(By.CSS_SELECTOR, "#tpam tbody tr")
-                return len(rows) > 0
+    @staticmethod
+    def _split_at_br(cell) -> Tuple[str, str]:
+        """
+        Split a cell's text at its first <br> into (before, after).
 
-        except Exception as exc:
-            print(f"  ✗ Page navigation failed: {exc}")
-            return False
+        Text nodes on each side are joined as rendered, so inline tags inside
+        the name (<span>道路</span>工程) do not split it. Without a <br> the
+        whole text is returned as the second part.
+        """
+        br = cell.find("br")
+        parts: Tuple[List[str], List[str]] = ([], [])
+        side = parts[0] if br is not None else parts[1]
+        for node in cell.descendants:
+            if node is br:
+                side = parts[1]
+            elif isinstance(node, NavigableString) and not isinstance(node, Comment):
+                side.append(node)
+        before, after = (" ".join("".join(texts).split()) for texts in parts)
+        return before, after
 
     def _extract_detail_link(self, cell) -> Optional[str]:
         """Extract detail page link from cell."""
-        try:
-            links = cell.find_elements(By.TAG_NAME, "a")
-            for link in links:
-                link_text = link.text.strip()
-                if "檢視" in link_text:
-                    href = link.get_attribute("href")
-                    if href and not href.lower().startswith("javascript"):
-                        return urljoin(self.BASE_URL, href)
-        except:
-            pass
-        return None
-
-    def scrape_all(self, max_pages: Optional[int] = None) -> Dict[str, Any]:
+        link = _DETAIL_LINK_SELECTOR.select_one(cell)
+        return urljoin(self.BASE_URL, link["href"]) if link else None
+
+    def scrape_all(
+        self,
+        max_pages: Optional[int] = None,
+        on_record: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict[str, Any]:
         """Run the scraper and return structured results."""
         try:
             self.setup_driver()
-            records = self.scrape_tender_announcements(max_pages=max_pages)
+            records = self.scrape_tender_announcements(max_pages=max_pages, on_record=on_record)
             return self._build_result(records)
         finally:
             self.close_driver()
+            gc.collect()
 
     def _build_result(self, records: List[Dict]) -> Dict[str, Any]:
         """Build final result structure."""
-        unique_agencies = {item.get("agency") for item in records if item.get("agency")}
+        # Single pass, one dict lookup per record
+        unique_agencies = {agency for item in records if (agency := item.get("agency"))}
+        total_records = len(records)
         return {
             "crawlerId": "tender-announcement",
             "runAt": datetime.now().isoformat(),
             "stats": {
-                "totalRecords": len(records),
+                "totalRecords": total_records,
                 "totalAgencies": len(unique_agencies),
             },
-            "totalRecords": len(records),
+            "totalRecords": total_records,
             "data": records,
         }
 
 
-def run_tender_scraper(max_pages: Optional[int] = None) -> Dict[str, Any]:
-    """Run the tender scraper and return results."""
-    scraper = TenderScraper(headless=True)
-    return scraper.scrape_all(max_pages=max_pages)
+def run_tender_scraper(
+    max_pages: Optional[int] = None,
+    on_record: Optional[Callable[[Dict], None]] = None,
+    reuse_driver: bool = False,
+) -> Dict[str, Any]:
+    """Run the tender scraper and return results (reuse_driver keeps Chrome alive afterwards)."""
+    scraper = TenderScraper(headless=True, reuse_driver=reuse_driver)
+    return scraper.scrape_all(max_pages=max_pages, on_record=on_record)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+"""Tests for the per-process Chrome driver cache."""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    from scrapers.chromedriver import live_driver_count, shutdown_drivers
+    from scrapers.public_read_scraper import PublicReadScraper
+    from scrapers.tender_scraper import TenderScraper
+except ImportError as exc:  # selenium / bs4 not installed
+    raise unittest.SkipTest(f"scraper dependencies unavailable: {exc}")
+
+
+class DriverCacheTest(unittest.TestCase):
+    """Browsers must not pile up when scrapers run one after another."""
+
+    def setUp(self):
+        shutdown_drivers()
+        self.launched = []
+
+        def launch(scraper, options):
+            driver = mock.MagicMock()
+            driver.service.is_connectable.return_value = True
+            self.launched.append(driver)
+            return driver
+
+        for cls in (PublicReadScraper, TenderScraper):
+            patcher = mock.patch.object(cls, "_launch_driver", launch)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(shutdown_drivers)
+
+    def test_sequential_scrapers_keep_one_live_driver(self):
+        first = PublicReadScraper()
+        first.setup_driver()
+        self.assertEqual(live_driver_count(), 1)
+        first.close_driver()
+
+        second = TenderScraper()
+        second.setup_driver()
+        self.assertEqual(live_driver_count(), 1)
+        second.close_driver()
+
+        self.assertEqual(live_driver_count(), 0)
+        self.assertEqual(len(self.launched), 2)
+        for driver in self.launched:
+            driver.quit.assert_called_once()
+
+    def test_reuse_driver_shares_browser_with_same_options(self):
+        first = PublicReadScraper(reuse_driver=True)
+        first.setup_driver()
+        first.close_driver()
+
+        second = PublicReadScraper(reuse_driver=True)
+        second.setup_driver()
+        self.assertIs(second.driver, self.launched[0])
+        self.assertEqual(live_driver_count(), 1)
+        second.close_driver()
+
+        self.assertEqual(len(self.launched), 1)
+        self.launched[0].quit.assert_not_called()
+        shutdown_drivers()
+        self.launched[0].quit.assert_called_once()
+
+    def test_checked_out_driver_is_not_shared(self):
+        first = PublicReadScraper(reuse_driver=True)
+        first.setup_driver()
+        second = PublicReadScraper(reuse_driver=True)
+        second.setup_driver()
+        self.assertIsNot(first.driver, second.driver)
+        self.assertEqual(live_driver_count(), 2)
+
+        first_driver, second_driver = first.driver, second.driver
+        first.close_driver()
+        second.close_driver()
+        # Only one idle browser per launch configuration is kept
+        self.assertEqual(live_driver_count(), 1)
+        first_driver.quit.assert_not_called()
+        second_driver.quit.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
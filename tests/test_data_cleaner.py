@@ -0,0 +1,145 @@
+"""Tests for the data cleaner's dedup keys, expiry check and file discovery."""
+
+import contextlib
+import io
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    from utils.data_cleaner import DataCleaner, _is_expired_fast
+except ImportError as exc:  # orjson / Drive client libraries not installed
+    raise unittest.SkipTest(f"data cleaner dependencies unavailable: {exc}")
+
+
+def _quiet_cleaner(data_dir: str) -> DataCleaner:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return DataCleaner(data_dir, pretty=False)
+
+
+class DedupKeyTest(unittest.TestCase):
+    """Records collapse on their case number, or on content when there is none."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cleaner = _quiet_cleaner(tmp.name)
+
+    def key(self, crawler_type, record):
+        return self.cleaner._get_dedup_key(record, DataCleaner.CRAWLER_CONFIGS[crawler_type])
+
+    def test_case_number_plus_discriminator_per_type(self):
+        discriminators = {
+            "tender": "transmission_count",
+            "public_read": "announcement_count",
+            "promotion": "procurement_type",
+        }
+        for crawler_type, field in discriminators.items():
+            with self.subTest(crawler_type=crawler_type):
+                base = {"tenderId": "A1", field: "1", "tenderName": "道路工程"}
+                renamed = dict(base, tenderName="道路工程（更正）")
+                next_round = dict(base, **{field: "2"})
+                self.assertEqual(self.key(crawler_type, base), self.key(crawler_type, renamed))
+                self.assertNotEqual(self.key(crawler_type, base), self.key(crawler_type, next_round))
+
+    def test_promotion_rows_without_case_number_use_fallback_fields(self):
+        row = {
+            "tenderName": "停車場興建營運案",
+            "agency": "臺北市政府",
+            "date": "114/12/13",
+            "sourceUrl": "https://ppp.mof.gov.tw/detail?id=1",
+            "pageType": "announce",
+        }
+        rescraped = dict(row, date="114/12/20", pageType="registered")
+        other_case = dict(row, sourceUrl="https://ppp.mof.gov.tw/detail?id=2")
+        self.assertEqual(self.key("promotion", row), self.key("promotion", rescraped))
+        self.assertNotEqual(self.key("promotion", row), self.key("promotion", other_case))
+
+    def test_scraped_at_only_difference_dedups(self):
+        # No case number and no fallback fields: the content hash decides
+        record = {"serial_no": "1", "agency": "經濟部", "scrapedAt": "2025-12-13T08:00:00"}
+        rescraped = dict(record, scrapedAt="2025-12-14T08:00:00")
+        changed = dict(record, agency="交通部")
+        self.assertEqual(self.key("tender", record), self.key("tender", rescraped))
+        self.assertNotEqual(self.key("tender", record), self.key("tender", changed))
+        self.assertEqual(
+            self.cleaner._get_record_hash({"a": 1, "scraped_at": "x"}),
+            self.cleaner._get_record_hash({"a": 1, "scraped_at": "y"}),
+        )
+
+
+class ExpiryTest(unittest.TestCase):
+    """ROC dates expire the day after they name, whichever separator they use."""
+
+    def test_roc_date_separators(self):
+        for date_str in ("114/12/13", "114.12.13", "114-12-13", " 114/12/13 "):
+            with self.subTest(date_str=date_str):
+                self.assertFalse(_is_expired_fast(date_str, datetime(2025, 12, 13)))
+                self.assertTrue(_is_expired_fast(date_str, datetime(2025, 12, 14)))
+
+    def test_unparseable_dates_are_kept(self):
+        today = datetime(2025, 12, 14)
+        for date_str in ("", None, "114/12-13", "2025/12/13", "114/13/40", "詳見公告"):
+            with self.subTest(date_str=date_str):
+                self.assertFalse(_is_expired_fast(date_str, today))
+
+
+class FileDiscoveryTest(unittest.TestCase):
+    """Only finished scraper output is loaded: no partial, sidecar or merged files."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_dir = Path(tmp.name)
+        self.cleaner = _quiet_cleaner(tmp.name)
+
+    def write(self, name, payload):
+        (self.data_dir / name).write_bytes(payload)
+
+    def test_iter_files_filters_by_suffix_and_name(self):
+        for name in (
+            "public_read_20251213_080000.json",
+            "public_read_20251214_080000.jsonl",
+            "public_read_20251215_080000.jsonl.part",
+            "public_read_20251214_080000.meta.json",
+            "public_read_merged_20251214_batch001.json",
+            "tender_announcement_20251214_080000.jsonl",
+        ):
+            self.write(name, b"{}")
+        (self.data_dir / "public_read_dir.json").mkdir()
+
+        found = {path.name for path in self.cleaner._iter_files("public_read_*.json")}
+        self.assertEqual(
+            found, {"public_read_20251213_080000.json", "public_read_20251214_080000.jsonl"}
+        )
+
+    def test_clean_merges_json_and_jsonl(self):
+        live = {"tenderId": "A1", "announcement_count": "1", "public_read_end": "200/01/01"}
+        expired = {"tenderId": "B1", "announcement_count": "1", "public_read_end": "100/01/01"}
+        self.write(
+            "public_read_20251213_080000.json",
+            orjson.dumps({"data": [dict(live, scrapedAt="old"), expired]}),
+        )
+        self.write(
+            "public_read_20251214_080000.jsonl",
+            b"\n".join(orjson.dumps(r) for r in (dict(live, scrapedAt="new"), expired)) + b"\n",
+        )
+        self.write("public_read_20251215_080000.jsonl.part", orjson.dumps(live) + b"\n")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = self.cleaner.clean_crawler_type("public_read")
+
+        self.assertEqual(stats, {"original": 4, "after_expire": 2, "after_dedup": 1, "files": 1})
+        (merged,) = self.data_dir.glob("public_read_merged_*.json")
+        # Newest file first, so the latest scrape of a duplicate is the one kept
+        self.assertEqual(orjson.loads(merged.read_bytes())["data"], [dict(live, scrapedAt="new")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,14 +19,27 @@ class Config:
         'SERVICE_ACCOUNT_FILE',
         'service_account.json'
     )
+    # Parallel uploads; Drive throttles writes per user, so keep this small
+    GDRIVE_CONCURRENCY = int(os.environ.get('GDRIVE_CONCURRENCY', '4'))
     
     # Scraper settings
     HEADLESS = True  # Always headless in cloud environment
     WAIT_SECONDS = 20
     MAX_PAGES = 100  # Safety limit
+    # Scrapers run in parallel processes; set to 1 on low-memory hosts to run serially
+    SCRAPER_CONCURRENCY = int(os.environ.get('SCRAPER_CONCURRENCY', '3'))
+    # Keep Chrome alive between scrapers in the same worker process (useful with SCRAPER_CONCURRENCY=1)
+    REUSE_DRIVER = os.environ.get('REUSE_DRIVER', '0') == '1'
+    # Log heap (tracemalloc) and peak RSS after each stage; tracing slows the run
+    TRACE_MEMORY = os.environ.get('TRACE_MEMORY', '0') == '1'
     
     # Output settings
     OUTPUT_DIR = 'output'
+    PRETTY_JSON = os.environ.get('PRETTY_JSON', '0') == '1'  # Indent output (debug only)
+    # Stream records to <prefix>_<ts>.jsonl (+ .meta.json) instead of one JSON document
+    STREAM_OUTPUT = os.environ.get('STREAM_OUTPUT', '1') == '1'
+    # {filename: sha256} of files already uploaded, used to skip unchanged re-uploads
+    UPLOAD_CACHE_FILE = '.upload_cache.json'
     
     @classmethod
     def get_output_path(cls, filename: str) -> str:
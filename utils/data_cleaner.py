@@ -8,13 +8,59 @@
 Adapted for SelfEcoGrab cloud runner.
 """
 
-import json
+import fnmatch
 import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 import re
 
+import orjson
+
+try:
+    # xxh3：SIMD 加速的非加密 hash，比 MD5 快一個數量級
+    from xxhash import xxh3_64_intdigest as _hash64
+except ImportError:  # 未安裝 xxhash 時退回標準庫 blake2b
+    def _hash64(data: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+# 每次抓取都會變動的時間欄位，不納入內容 hash，否則同一筆資料重抓後永遠不會被去重
+_VOLATILE_FIELDS = frozenset(("scrapedAt", "scraped_at"))
+
+# 民國年日期：114/12/13、114.12.13、114-12-13（前後分隔符需一致）
+_ROC_DATE_RE = re.compile(r"(\d{3})([/.\-])(\d{1,2})\2(\d{1,2})")
+
+
+@lru_cache(maxsize=4096)
+def _parse_roc_date(date_str: str) -> Optional[datetime]:
+    """解析民國年日期字串（需已去除前後空白），轉換為 datetime（同一日期字串大量重複，結果快取）"""
+    match = _ROC_DATE_RE.match(date_str)
+    if not match:
+        return None
+    year, _, month, day = match.groups()
+    try:
+        return datetime(int(year) + 1911, int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _is_expired_fast(date_str: str, today: datetime) -> bool:
+    """判斷是否過期（模組層函式，逐筆呼叫時省去方法查找）"""
+    date_str = date_str.strip() if date_str else ""
+    if not date_str:
+        # 如果沒有截止日期，視為不過期（保留資料）
+        return False
+    
+    parsed_date = _parse_roc_date(date_str)
+    if not parsed_date:
+        # 無法解析的日期，視為不過期（保留資料）
+        return False
+    
+    return parsed_date < today
+
 
 class DataCleaner:
     """資料清理器：過期資料刪除、去重、合併"""
@@ -25,6 +71,7 @@ class DataCleaner:
             "file_pattern": "tender_announcement_*.json",  # SelfEcoGrab format
             "date_field": "deadline",
             "id_field": "tenderId",
+            "dedup_fields": ("tenderId", "transmission_count"),
             "crawler_id": "tender-announcement",
             "output_prefix": "tender_merged",
         },
@@ -32,6 +79,7 @@ class DataCleaner:
             "file_pattern": "public_read_*.json",
             "date_field": "public_read_end",
             "id_field": "tenderId",
+            "dedup_fields": ("tenderId", "announcement_count"),
             "crawler_id": "public-read",
             "output_prefix": "public_read_merged",
         },
@@ -39,14 +87,21 @@ class DataCleaner:
             "file_pattern": "procurement_*.json",  # SelfEcoGrab format for ppp-mof
             "date_field": "announcementEndDate",
             "id_field": "tenderId",
+            # 同一案號會同時出現在公告與案件列表，以公告類型區分
+            "dedup_fields": ("tenderId", "procurement_type"),
+            # scrapers/procurement_scraper.py 的列表資料沒有案號，改以名稱、機關與連結識別
+            "fallback_fields": ("tenderName", "agency", "sourceUrl"),
             "crawler_id": "ppp-mof",
             "output_prefix": "promotion_merged",
         },
     }
     
-    def __init__(self, data_dir: str = "."):
+    def __init__(self, data_dir: str = ".", pretty: bool = True):
         self.data_dir = Path(data_dir)
+        # 不需人工閱讀時關閉縮排，輸出檔較小、序列化也較快
+        self.pretty = pretty
         self.today = self._get_today_roc()
+        self._today_dt = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         print(f"📅 今天日期（民國年）: {self.today}")
     
     def _get_today_roc(self) -> str:
@@ -55,72 +110,60 @@ class DataCleaner:
         roc_year = now.year - 1911
         return f"{roc_year}/{now.month:02d}/{now.day:02d}"
     
-    def _parse_roc_date(self, date_str: str) -> Optional[datetime]:
-        """解析民國年日期字串，轉換為 datetime"""
-        if not date_str or not date_str.strip():
-            return None
-        
-        # 清理日期字串
-        date_str = date_str.strip()
-        
-        # 嘗試不同格式
-        patterns = [
-            r"(\d{3})/(\d{1,2})/(\d{1,2})",  # 114/12/13
-            r"(\d{3})\.(\d{1,2})\.(\d{1,2})",  # 114.12.13
-            r"(\d{3})-(\d{1,2})-(\d{1,2})",  # 114-12-13
-        ]
-        
-        for pattern in patterns:
-            match = re.match(pattern, date_str)
-            if match:
-                try:
-                    roc_year = int(match.group(1))
-                    month = int(match.group(2))
-                    day = int(match.group(3))
-                    ad_year = roc_year + 1911
-                    return datetime(ad_year, month, day)
-                except ValueError:
-                    continue
-        
-        return None
+    def _get_record_hash(self, record: Dict[str, Any]) -> int:
+        """計算記錄內容（不含抓取時間）的 64-bit hash，用於去重"""
+        if not _VOLATILE_FIELDS.isdisjoint(record):
+            record = {k: v for k, v in record.items() if k not in _VOLATILE_FIELDS}
+        # 排序 key 確保相同內容產生相同 hash
+        return _hash64(orjson.dumps(record, option=orjson.OPT_SORT_KEYS))
     
-    def _is_expired(self, date_str: str) -> bool:
-        """判斷是否過期"""
-        if not date_str or not date_str.strip():
-            # 如果沒有截止日期，視為不過期（保留資料）
-            return False
-        
-        parsed_date = self._parse_roc_date(date_str)
-        if not parsed_date:
-            # 無法解析的日期，視為不過期（保留資料）
-            return False
-        
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        return parsed_date < today
+    def _get_dedup_key(self, record: Dict[str, Any], config: Dict[str, Any]) -> int:
+        """
+        去重 key：有案號時用案號（加上區分欄位），缺案號時用 fallback_fields，
+        兩者皆無才用完整內容，皆壓成 64-bit 指紋。
+        集合中只存 int，大量記錄時比存字串 tuple 省數倍記憶體；碰撞機率約 n²/2⁶⁵，可忽略。
+        """
+        if record.get(config["id_field"]):
+            return _hash64(orjson.dumps([record.get(field, "") for field in config["dedup_fields"]]))
+        fallback_fields = config.get("fallback_fields")
+        if fallback_fields and any(record.get(field) for field in fallback_fields):
+            return _hash64(orjson.dumps([record.get(field, "") for field in fallback_fields]))
+        return self._get_record_hash(record)
     
-    def _get_record_hash(self, record: Dict[str, Any], id_field: str) -> str:
-        """計算記錄的 hash，用於去重"""
-        # 使用案號 + 完整內容的 hash
-        record_id = record.get(id_field, "")
-        # 排序 key 確保相同內容產生相同 hash
-        content = json.dumps(record, sort_keys=True, ensure_ascii=False)
-        content_hash = hashlib.md5(content.encode()).hexdigest()
-        return f"{record_id}_{content_hash}"
+    def _iter_files(self, pattern: str) -> Iterator[Path]:
+        """以 os.scandir 單次掃描目錄，產生符合 pattern（含 .jsonl）的檔案"""
+        if not self.data_dir.is_dir():
+            return
+        jsonl_pattern = f"{pattern}l"
+        with os.scandir(self.data_dir) as it:
+            for entry in it:
+                name = entry.name
+                # Skip merged files and .meta.json sidecars to avoid re-processing
+                if "_merged_" in name or name.endswith(".meta.json"):
+                    continue
+                if not (fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(name, jsonl_pattern)):
+                    continue
+                if entry.is_file():
+                    yield Path(entry.path)
     
     def _load_json_files(self, pattern: str) -> List[Dict[str, Any]]:
-        """載入符合 pattern 的所有 JSON 檔案"""
-        files = list(self.data_dir.glob(pattern))
+        """載入符合 pattern 的所有 JSON 檔案（含串流輸出的 .jsonl），新檔案在前"""
+        # 檔名含時間戳記：由新到舊排序，去重時保留最新抓取的資料
+        files = sorted(self._iter_files(pattern), key=lambda p: p.name, reverse=True)
         all_records = []
         
         for file_path in files:
-            # Skip merged files to avoid re-processing
-            if "_merged_" in file_path.name:
-                continue
-                
             print(f"  📂 讀取: {file_path.name}")
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                # orjson 直接解析 bytes，需以二進位模式開檔
+                if file_path.suffix == ".jsonl":
+                    # JSON Lines：每行一筆記錄
+                    with open(file_path, "rb") as f:
+                        all_records.extend(orjson.loads(line) for line in f if line.strip())
+                    continue
+                
+                with open(file_path, "rb") as f:
+                    data = orjson.loads(f.read())
                 
                 # 提取資料
                 if "data" in data:
@@ -149,9 +192,11 @@ class DataCleaner:
             return 0
         
         timestamp = datetime.now().strftime("%Y%m%d")
+        merged_at = datetime.now().isoformat()
         total_batches = (len(records) + batch_size - 1) // batch_size
+        dump_option = orjson.OPT_INDENT_2 if self.pretty else 0
         
-        for i in range(total_batches):
+        def write_batch(i: int) -> None:
             start = i * batch_size
             end = min((i + 1) * batch_size, len(records))
             batch_records = records[start:end]
@@ -161,18 +206,22 @@ class DataCleaner:
             
             payload = {
                 "crawlerId": crawler_id,
-                "mergedAt": datetime.now().isoformat(),
+                "mergedAt": merged_at,
                 "batchNumber": i + 1,
                 "totalBatches": total_batches,
                 "totalRecords": len(batch_records),
                 "data": batch_records,
             }
             
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
+            with open(filepath, "wb") as f:
+                f.write(orjson.dumps(payload, option=dump_option))
             
             print(f"    💾 已存檔: {filename} ({len(batch_records)} 筆)")
         
+        # 各批次寫入不同檔案，以執行緒平行寫入（檔案 I/O 期間釋放 GIL）
+        with ThreadPoolExecutor(max_workers=min(8, total_batches)) as executor:
+            list(executor.map(write_batch, range(total_batches)))
+        
         return total_batches
     
     def clean_crawler_type(self, crawler_type: str) -> Dict[str, int]:
@@ -199,32 +248,32 @@ class DataCleaner:
                 "files": 0,
             }
         
-        # 2. 過濾過期資料
-        print(f"\n🗑 過濾過期資料 ({config['date_field']})...")
-        valid_records = [
-            r for r in records
-            if not self._is_expired(r.get(config["date_field"], ""))
-        ]
-        expired_count = original_count - len(valid_records)
-        print(f"  ✓ 過期資料: {expired_count} 筆")
-        print(f"  ✓ 有效資料: {len(valid_records)} 筆")
-        
-        # 3. 去除重複
-        print(f"\n🔄 去除重複資料 ({config['id_field']})...")
-        seen_hashes = set()
+        # 2. 過濾過期資料並去除重複（單次走訪，不另建中間 list）
+        print(f"\n🗑 過濾過期資料 ({config['date_field']}) 並去除重複 ({', '.join(config['dedup_fields'])})...")
+        today = self._today_dt
+        date_field = config["date_field"]
+        get_dedup_key = self._get_dedup_key
+        seen_keys = set()
         unique_records = []
+        expired_count = 0
         
-        for record in valid_records:
-            record_hash = self._get_record_hash(record, config["id_field"])
-            if record_hash not in seen_hashes:
-                seen_hashes.add(record_hash)
+        for record in records:
+            if _is_expired_fast(record.get(date_field, ""), today):
+                expired_count += 1
+                continue
+            key = get_dedup_key(record, config)
+            if key not in seen_keys:
+                seen_keys.add(key)
                 unique_records.append(record)
         
-        duplicate_count = len(valid_records) - len(unique_records)
+        valid_count = original_count - expired_count
+        duplicate_count = valid_count - len(unique_records)
+        print(f"  ✓ 過期資料: {expired_count} 筆")
+        print(f"  ✓ 有效資料: {valid_count} 筆")
         print(f"  ✓ 重複資料: {duplicate_count} 筆")
         print(f"  ✓ 不重複資料: {len(unique_records)} 筆")
         
-        # 4. 分批存檔
+        # 3. 分批存檔
         print(f"\n💾 分批存檔 ({config['output_prefix']})...")
         files_count = self._save_batches(
             unique_records,
@@ -234,23 +283,32 @@ class DataCleaner:
         
         return {
             "original": original_count,
-            "after_expire": len(valid_records),
+            "after_expire": valid_count,
             "after_dedup": len(unique_records),
             "files": files_count,
         }
     
     def clean_all(self) -> Dict[str, Dict[str, int]]:
-        """清理所有類型的爬蟲資料"""
+        """清理所有類型的爬蟲資料（各類型互不相依、輸出檔名不重疊，以多行程平行處理）"""
         results = {}
         
-        for crawler_type in self.CRAWLER_CONFIGS:
-            try:
-                results[crawler_type] = self.clean_crawler_type(crawler_type)
-            except Exception as e:
-                print(f"  ⚠ 處理 {crawler_type} 時發生錯誤: {e}")
-                results[crawler_type] = {"error": str(e)}
+        with ProcessPoolExecutor(max_workers=len(self.CRAWLER_CONFIGS)) as executor:
+            futures = {
+                executor.submit(
+                    _clean_one, str(self.data_dir), crawler_type, self.pretty
+                ): crawler_type
+                for crawler_type in self.CRAWLER_CONFIGS
+            }
+            for future in as_completed(futures):
+                crawler_type = futures[future]
+                try:
+                    results[crawler_type] = future.result()
+                except Exception as e:
+                    print(f"  ⚠ 處理 {crawler_type} 時發生錯誤: {e}")
+                    results[crawler_type] = {"error": str(e)}
         
-        return results
+        # 依設定順序輸出統計
+        return {crawler_type: results[crawler_type] for crawler_type in self.CRAWLER_CONFIGS}
     
     def get_merged_files(self) -> List[str]:
         """取得所有合併後的檔案路徑"""
@@ -263,14 +321,19 @@ class DataCleaner:
         return merged_files
 
 
-def run_data_cleaner(data_dir: str = ".") -> Dict[str, Any]:
+def _clean_one(data_dir: str, crawler_type: str, pretty: bool) -> Dict[str, int]:
+    """子行程入口：以新的 DataCleaner 清理單一爬蟲類型"""
+    return DataCleaner(data_dir, pretty=pretty).clean_crawler_type(crawler_type)
+
+
+def run_data_cleaner(data_dir: str = ".", pretty: bool = True) -> Dict[str, Any]:
     """執行資料清理並返回結果"""
     print("\n" + "=" * 70)
     print("📊 資料清理與合併工具")
     print("    功能: 刪除過期資料、去重複、合併檔案")
     print("=" * 70)
     
-    cleaner = DataCleaner(data_dir)
+    cleaner = DataCleaner(data_dir, pretty=pretty)
     
     # 清理所有類型
     results = cleaner.clean_all()
@@ -3,16 +3,86 @@ Google Drive upload utility using Service Account authentication.
 Enhanced with file listing, download, move, and delete capabilities.
 """
 
+import gzip
 import io
-import json
+import mimetypes
 import os
-from datetime import datetime, timedelta
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
+import httplib2
+import orjson
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload, MediaIoBaseUpload
+from requests.adapters import HTTPAdapter
+
+# Not in the stdlib table; without it JSON Lines output is uploaded as octet-stream
+mimetypes.add_type('application/x-ndjson', '.jsonl')
+
+
+class _PooledHttp:
+    """
+    httplib2-compatible transport backed by a pooled, authorized requests session.
+    
+    googleapiclient only calls `request()` on its transport, so this lets every
+    upload thread share one thread-safe pool of keep-alive connections instead
+    of each thread opening its own TLS connection through httplib2.
+    """
+    
+    def __init__(self, credentials, pool_size: int = 16, timeout: int = 120):
+        self.session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.timeout = timeout
+    
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        """Send a request and return an httplib2-style (response, content) pair."""
+        response = self.session.request(
+            method, uri, data=body, headers=headers, timeout=self.timeout
+        )
+        content = response.content
+        info = {key.lower(): value for key, value in response.headers.items()}
+        # requests already decoded the body; mirror httplib2 so lengths match it
+        if info.pop('content-encoding', None):
+            info['content-length'] = str(len(content))
+        info['status'] = str(response.status_code)
+        return httplib2.Response(info), content
+
+
+@lru_cache(maxsize=8)
+def _load_credentials(service_account_file: str, scopes: tuple):
+    """Parse a service account key once per (file, scopes); the RSA key load is not free."""
+    return service_account.Credentials.from_service_account_file(
+        service_account_file,
+        scopes=list(scopes)
+    )
+
+
+class _RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads."""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self, cost: int = 1):
+        """Block until the caller's turn; `cost` calls' worth of slots are reserved."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval * cost
+        if slot > now:
+            time.sleep(slot - now)
 
 
 class DriveUploader:
@@ -20,126 +90,344 @@ class DriveUploader:
     
     SCOPES = ['https://www.googleapis.com/auth/drive']
     
-    def __init__(self, service_account_file: str, folder_id: str):
+    # Retry policy for rate limiting (429) and transient server errors (5xx)
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # Drive also reports quota throttling as 403 with one of these reasons
+    RATE_LIMIT_REASONS = (b'rateLimitExceeded', b'userRateLimitExceeded')
+    MAX_RETRIES = 5
+    
+    # Stay just under Drive's ~10 writes/s per-user quota
+    WRITES_PER_SECOND = 9
+    
+    # Resumable upload chunk size (must be a multiple of 256 KiB)
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+    
+    # Smaller files go up in one multipart request; resumable sessions cost an extra round-trip
+    RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+    
+    # files.list returns at most 1000 results per page
+    LIST_PAGE_SIZE = 1000
+    
+    # Seconds a folder listing is reused before asking Drive again
+    LIST_CACHE_TTL = 30
+    
+    # Drive's batch endpoint accepts at most 100 calls per request
+    BATCH_SIZE = 100
+    
+    # Per-user write quota is roughly 10 requests/s, so keep single deletes at that level
+    DELETE_WORKERS = 10
+    
+    def __init__(self, service_account_file: str, folder_id: str,
+                 chunk_size: int = UPLOAD_CHUNK_SIZE):
         """
         Initialize the uploader.
         
         Args:
             service_account_file: Path to service account JSON file
             folder_id: Target Google Drive folder ID
+            chunk_size: Resumable upload chunk size in bytes (multiple of 256 KiB)
         """
         self.folder_id = folder_id
-        self.service = self._build_service(service_account_file)
+        self.chunk_size = chunk_size
+        self._write_limiter = _RateLimiter(self.WRITES_PER_SECOND)
+        self._list_cache: Dict[tuple, tuple] = {}
+        self._list_cache_lock = threading.Lock()
+        self.credentials = _load_credentials(service_account_file, tuple(self.SCOPES))
+        self.service = self._build_service()
     
-    def _build_service(self, service_account_file: str):
-        """Build Google Drive API service."""
-        credentials = service_account.Credentials.from_service_account_file(
-            service_account_file,
-            scopes=self.SCOPES
+    def _build_service(self):
+        """
+        Build Google Drive API service.
+        
+        All threads share one pooled keep-alive session, so parallel uploads
+        reuse open TLS connections instead of handshaking per request. The
+        discovery document bundled with googleapiclient is used, so no request
+        is made to the discovery service.
+        """
+        return build(
+            'drive', 'v3',
+            http=_PooledHttp(self.credentials),
+            static_discovery=True,
+            cache_discovery=False
         )
-        return build('drive', 'v3', credentials=credentials)
+    
+    def _retry_delay(self, error: HttpError, attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying a failed request.
+        
+        Returns:
+            Delay in seconds, or None if the error should not be retried
+        """
+        status = error.resp.status
+        content = error.content or b''
+        rate_limited = status == 403 and any(reason in content for reason in self.RATE_LIMIT_REASONS)
+        if (status not in self.RETRY_STATUSES and not rate_limited) or attempt >= self.MAX_RETRIES:
+            return None
+        retry_after = error.resp.get('retry-after')
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return (2 ** attempt) + random.random()
+    
+    def _execute(self, request, write: bool = False, cost: int = 1):
+        """
+        Execute an API request, retrying rate limits and 5xx errors with backoff.
+        
+        Args:
+            request: googleapiclient request (or batch) to execute
+            write: Whether the request modifies Drive (rate limited; clears cached listings)
+            cost: Number of writes the request makes (one per call in a batch)
+            
+        Returns:
+            The request's response
+        """
+        attempt = 0
+        while True:
+            if write:
+                self._write_limiter.wait(cost)
+            try:
+                return request.execute()
+            except HttpError as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+            finally:
+                # A failed write may still have reached Drive, so drop listings either way
+                if write:
+                    self.invalidate_list_cache()
     
     # =========================================================================
     # Upload Methods
     # =========================================================================
     
-    def upload_file(self, file_path: str, mime_type: str = 'application/json') -> Optional[str]:
+    def upload_file(self, file_path: str, mime_type: Optional[str] = None) -> Optional[str]:
         """
         Upload a file to Google Drive.
         
         Args:
             file_path: Path to the file to upload
-            mime_type: MIME type of the file
+            mime_type: MIME type of the file (guessed from the extension if omitted)
             
         Returns:
             File ID if successful, None otherwise
         """
+        mime_type = mime_type or mimetypes.guess_type(file_path)[0] or 'application/octet-stream'
         try:
-            file_name = Path(file_path).name
-            
-            file_metadata = {
-                'name': file_name,
-                'parents': [self.folder_id]
-            }
-            
-            media = MediaFileUpload(
+            resumable = os.path.getsize(file_path) > self.RESUMABLE_THRESHOLD
+        except OSError as e:
+            print(f"  ✗ Upload failed for {file_path}: {e}")
+            return None
+        return self._upload_media(
+            Path(file_path).name,
+            lambda: MediaFileUpload(
                 file_path,
                 mimetype=mime_type,
-                resumable=True
-            )
-            
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id'
-            ).execute()
+                chunksize=self.chunk_size,
+                resumable=resumable
+            ),
+            source=file_path
+        )
+    
+    def _upload_media(self, file_name: str, make_media: Callable,
+                      source: str) -> Optional[str]:
+        """
+        Create a Drive file from a media body, retrying rate limits and 5xx errors.
+        
+        Args:
+            file_name: Name of the file on Drive
+            make_media: Returns a fresh media body (called again on every retry)
+            source: Description of the upload for log messages
             
-            file_id = file.get('id')
-            print(f"  ✓ Uploaded: {file_name} (ID: {file_id})")
-            return file_id
+        Returns:
+            File ID if successful, None otherwise
+        """
+        file_metadata = {
+            'name': file_name,
+            'parents': [self.folder_id]
+        }
+        
+        attempt = 0
+        while True:
+            try:
+                media = make_media()
+                self._write_limiter.wait()
+                
+                try:
+                    file = self.service.files().create(
+                        body=file_metadata,
+                        media_body=media,
+                        fields='id'
+                    ).execute()
+                finally:
+                    self.invalidate_list_cache()
+                
+                file_id = file.get('id')
+                print(f"  ✓ Uploaded: {file_name} (ID: {file_id})")
+                return file_id
+                
+            except HttpError as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    print(f"  ✗ Upload failed for {source}: {e}")
+                    return None
+                attempt += 1
+                print(f"  ↻ Retrying {file_name} in {delay:.1f}s (HTTP {e.resp.status})")
+                time.sleep(delay)
+                
+            except Exception as e:
+                print(f"  ✗ Upload failed for {source}: {e}")
+                return None
+    
+    def upload_files(self, file_paths: List[str], max_workers: int = 8,
+                     on_uploaded: Optional[Callable[[str, str], None]] = None) -> List[Optional[str]]:
+        """
+        Upload several files concurrently.
+        
+        Worker threads share the pooled Drive service (see `_build_service`).
+        
+        Args:
+            file_paths: Paths of the files to upload
+            max_workers: Maximum number of concurrent uploads
+            on_uploaded: Called as on_uploaded(file_path, file_id) in the calling
+                thread as soon as each upload succeeds
             
-        except Exception as e:
-            print(f"  ✗ Upload failed for {file_path}: {e}")
-            return None
+        Returns:
+            File IDs in the order of file_paths (None for failed uploads)
+        """
+        file_ids: Dict[str, Optional[str]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(self.upload_file, path): path for path in file_paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                file_ids[path] = future.result()
+                if file_ids[path] and on_uploaded:
+                    on_uploaded(path, file_ids[path])
+        return [file_ids[path] for path in file_paths]
     
-    def upload_json(self, data: dict, filename: str) -> Optional[str]:
+    def upload_json(self, data: dict, filename: str, compress: bool = False) -> Optional[str]:
         """
         Upload JSON data directly to Google Drive.
         
         Args:
             data: Dictionary to upload as JSON
             filename: Target filename
+            compress: Gzip the payload and store it as `{filename}.gz`
             
         Returns:
             File ID if successful, None otherwise
         """
-        # Save to temporary file first
-        temp_path = f"/tmp/{filename}"
-        try:
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            return self.upload_file(temp_path)
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        # Upload straight from memory; no temporary file on disk
+        if compress:
+            content = gzip.compress(
+                orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS), compresslevel=6
+            )
+            filename, mime_type = f"{filename}.gz", 'application/gzip'
+        else:
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            mime_type = 'application/json'
+        
+        return self._upload_media(
+            filename,
+            lambda: MediaIoBaseUpload(
+                io.BytesIO(content),
+                mimetype=mime_type,
+                chunksize=self.chunk_size,
+                resumable=len(content) > self.RESUMABLE_THRESHOLD
+            ),
+            source=filename
+        )
     
     # =========================================================================
     # List Methods
     # =========================================================================
     
     def list_files(self, folder_id: Optional[str] = None, 
-                   name_contains: Optional[str] = None) -> List[Dict]:
+                   name_contains: Optional[str] = None,
+                   fields: str = "id, name, createdTime, modifiedTime") -> List[Dict]:
         """
         List files in a folder.
         
         Args:
             folder_id: Folder ID to list (defaults to self.folder_id)
             name_contains: Filter by filename containing this string
+            fields: File fields to return; request only what the caller uses
             
         Returns:
             List of file metadata dicts with 'id', 'name', 'createdTime', 'modifiedTime'
+            (or the requested fields)
+        """
+        return self.list_files_with_metadata(fields, folder_id, name_contains)
+    
+    def list_files_with_metadata(self, fields: str,
+                                 folder_id: Optional[str] = None,
+                                 name_contains: Optional[str] = None) -> List[Dict]:
+        """
+        List files in a folder with arbitrary metadata fields.
+        
+        The fields come back in the listing itself, so inspecting N files
+        needs no follow-up get() per file.
+        
+        Args:
+            fields: File fields to return, e.g. "id, name, size, permissions"
+            folder_id: Folder ID to list (defaults to self.folder_id)
+            name_contains: Filter by filename containing this string
+            
+        Returns:
+            List of file metadata dicts with the requested fields
         """
         target_folder = folder_id or self.folder_id
+        cache_key = (target_folder, name_contains, fields)
+        with self._list_cache_lock:
+            cached = self._list_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.LIST_CACHE_TTL:
+            # Hand out copies so callers cannot mutate the cached entries
+            return [dict(f) for f in cached[1]]
+        
         try:
             query = f"'{target_folder}' in parents and trashed = false"
             if name_contains:
                 query += f" and name contains '{name_contains}'"
             
-            results = self.service.files().list(
-                q=query,
-                fields="files(id, name, createdTime, modifiedTime)",
-                orderBy="createdTime desc",
-                pageSize=100
-            ).execute()
-            
-            files = results.get('files', [])
-            return files
+            files = list(self._iter_files(query, fields=fields, order_by="createdTime desc"))
             
         except Exception as e:
             print(f"  ✗ List files failed: {e}")
             return []
+        
+        with self._list_cache_lock:
+            self._list_cache[cache_key] = (time.monotonic(), files)
+        return [dict(f) for f in files]
+    
+    def invalidate_list_cache(self):
+        """Forget cached folder listings (called by every write, see `_execute`)."""
+        with self._list_cache_lock:
+            self._list_cache.clear()
+    
+    def _iter_files(self, query: str, fields: str,
+                    order_by: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield every file matching a query, following nextPageToken.
+        
+        Args:
+            query: Drive search query
+            fields: File fields to return, e.g. "id, name"
+            order_by: Optional sort order
+            
+        Returns:
+            Iterator over file metadata dicts
+        """
+        files = self.service.files()
+        request = files.list(
+            q=query,
+            fields=f"nextPageToken, files({fields})",
+            orderBy=order_by,
+            pageSize=self.LIST_PAGE_SIZE
+        )
+        while request is not None:
+            response = self._execute(request)
+            yield from response.get('files', [])
+            request = files.list_next(request, response)
     
     # =========================================================================
     # Download Methods
@@ -153,22 +441,48 @@ class DriveUploader:
             file_id: Google Drive file ID
             local_path: Local path to save the file
             
+        Returns:
+            True if successful, False otherwise
+        """
+        # Stream chunks straight into the file instead of buffering it in memory
+        with open(local_path, 'wb') as f:
+            ok = self._download_to(file_id, f)
+        if not ok:
+            # Don't leave a truncated file behind
+            os.remove(local_path)
+        return ok
+    
+    def _download_bytes(self, file_id: str) -> Optional[bytes]:
+        """
+        Download a file's content into memory.
+        
+        Args:
+            file_id: Google Drive file ID
+            
+        Returns:
+            File content, or None if the download failed
+        """
+        fh = io.BytesIO()
+        return fh.getvalue() if self._download_to(file_id, fh) else None
+    
+    def _download_to(self, file_id: str, fh) -> bool:
+        """
+        Download a file into a writable binary file object.
+        
+        Args:
+            file_id: Google Drive file ID
+            fh: Destination file object
+            
         Returns:
             True if successful, False otherwise
         """
         try:
             request = self.service.files().get_media(fileId=file_id)
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
+            downloader = MediaIoBaseDownload(fh, request, chunksize=self.chunk_size)
             
             done = False
             while not done:
-                status, done = downloader.next_chunk()
-            
-            # Write to local file
-            fh.seek(0)
-            with open(local_path, 'wb') as f:
-                f.write(fh.read())
+                status, done = downloader.next_chunk(num_retries=self.MAX_RETRIES)
             
             return True
             
@@ -176,6 +490,27 @@ class DriveUploader:
             print(f"  ✗ Download failed for {file_id}: {e}")
             return False
     
+    def download_files(self, downloads: Dict[str, str], max_workers: int = 8) -> Dict[str, bool]:
+        """
+        Download several files concurrently.
+        
+        Args:
+            downloads: Mapping of file ID to local path
+            max_workers: Maximum number of concurrent downloads
+            
+        Returns:
+            Mapping of file ID to whether its download succeeded
+        """
+        results: Dict[str, bool] = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(self.download_file, file_id, local_path): file_id
+                for file_id, local_path in downloads.items()
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+    
     def download_json(self, file_id: str) -> Optional[Dict]:
         """
         Download a JSON file and parse it.
@@ -186,46 +521,55 @@ class DriveUploader:
         Returns:
             Parsed JSON data or None if failed
         """
-        temp_path = f"/tmp/temp_download_{file_id}.json"
+        # Parse straight from memory; no temporary file on disk
+        content = self._download_bytes(file_id)
+        if content is None:
+            return None
         try:
-            if self.download_file(file_id, temp_path):
-                with open(temp_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            # Files written by upload_json(compress=True) start with the gzip magic bytes
+            if content[:2] == b'\x1f\x8b':
+                content = gzip.decompress(content)
+            return orjson.loads(content)
+        except (ValueError, OSError) as e:
+            print(f"  ✗ Invalid JSON in {file_id}: {e}")
             return None
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
     
     # =========================================================================
     # Move Methods
     # =========================================================================
     
-    def move_file(self, file_id: str, new_folder_id: str) -> bool:
+    def move_file(self, file_id: str, new_folder_id: str,
+                  old_folder_id: Optional[str] = None) -> bool:
         """
         Move a file to another folder.
         
         Args:
             file_id: File ID to move
             new_folder_id: Target folder ID
+            old_folder_id: Current parent folder ID; when given, the move takes
+                a single request instead of looking the parents up first
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Get current parents
-            file = self.service.files().get(
-                fileId=file_id,
-                fields='parents'
-            ).execute()
-            previous_parents = ",".join(file.get('parents', []))
+            if old_folder_id:
+                previous_parents = old_folder_id
+            else:
+                # Get current parents
+                file = self._execute(self.service.files().get(
+                    fileId=file_id,
+                    fields='parents'
+                ))
+                previous_parents = ",".join(file.get('parents', []))
             
             # Move to new folder
-            self.service.files().update(
+            self._execute(self.service.files().update(
                 fileId=file_id,
                 addParents=new_folder_id,
                 removeParents=previous_parents,
                 fields='id, parents'
-            ).execute()
+            ), write=True)
             
             return True
             
@@ -237,40 +581,95 @@ class DriveUploader:
     # Delete Methods
     # =========================================================================
     
-    def delete_file(self, file_id: str) -> bool:
+    def delete_file(self, file_id: str, trash: bool = False) -> bool:
         """
         Delete a file from Google Drive.
         
         Args:
             file_id: File ID to delete
+            trash: Move the file to trash instead of deleting it permanently
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            self.service.files().delete(fileId=file_id).execute()
+            self._execute(self._removal_request(file_id, trash), write=True)
             return True
         except Exception as e:
             print(f"  ✗ Delete failed for {file_id}: {e}")
             return False
     
+    def _removal_request(self, file_id: str, trash: bool):
+        """Build a request that trashes or permanently deletes a file."""
+        if trash:
+            return self.service.files().update(
+                fileId=file_id,
+                body={'trashed': True},
+                fields='id'
+            )
+        return self.service.files().delete(fileId=file_id)
+    
+    def _batch_delete(self, files: List[Dict], trash: bool = False) -> List[Dict]:
+        """
+        Delete (or trash) files through the Drive batch endpoint, BATCH_SIZE per request.
+        
+        Args:
+            files: File metadata dicts with at least 'id'
+            trash: Move the files to trash instead of deleting them permanently
+            
+        Returns:
+            Files that were not deleted by the batch (to retry one by one)
+        """
+        failed = []
+        
+        for start in range(0, len(files), self.BATCH_SIZE):
+            chunk = {file['id']: file for file in files[start:start + self.BATCH_SIZE]}
+            
+            def on_response(request_id, response, exception, chunk=chunk):
+                if exception is not None:
+                    failed.append(chunk[request_id])
+            
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for file_id in chunk:
+                batch.add(self._removal_request(file_id, trash), request_id=file_id)
+            try:
+                # Drive counts every call in a batch against the write quota
+                self._execute(batch, write=True, cost=len(chunk))
+            except HttpError as e:
+                print(f"  ⚠ Batch delete failed, retrying individually: {e}")
+                failed.extend(chunk.values())
+        
+        return failed
+    
     def delete_old_files(self, folder_id: Optional[str] = None, 
                          days: int = 30,
-                         name_contains: Optional[str] = None) -> int:
+                         name_contains: Optional[str] = None,
+                         mode: str = 'delete') -> int:
         """
         Delete files older than specified days.
         
+        With mode='trash' the files are only moved to trash: a cheaper, undoable
+        update that Drive purges on its own after 30 days, so no separate purge
+        job is needed.
+        
         Args:
             folder_id: Folder ID (defaults to self.folder_id)
             days: Delete files older than this many days
             name_contains: Only delete files with names containing this string
+            mode: 'delete' to remove permanently, 'trash' to move to trash
             
         Returns:
-            Number of files deleted
+            Number of files deleted (or trashed)
         """
+        if mode not in ('delete', 'trash'):
+            raise ValueError(f"Unknown delete mode: {mode}")
+        trash = mode == 'trash'
+        action = "Trashed" if trash else "Deleted"
+        
         target_folder = folder_id or self.folder_id
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-        cutoff_str = cutoff_date.strftime('%Y-%m-%dT%H:%M:%S')
+        # RFC 3339 in UTC with a trailing Z, as Drive queries expect
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+        cutoff_str = cutoff_date.strftime('%Y-%m-%dT%H:%M:%SZ')
         
         try:
             query = f"'{target_folder}' in parents and trashed = false"
@@ -278,20 +677,29 @@ class DriveUploader:
             if name_contains:
                 query += f" and name contains '{name_contains}'"
             
-            results = self.service.files().list(
-                q=query,
-                fields="files(id, name, createdTime)",
-                pageSize=100
-            ).execute()
-            
-            files = results.get('files', [])
+            # List every page before deleting so removals cannot shift later pages
+            files = list(self._iter_files(query, fields="id, name"))
             deleted_count = 0
             
+            # One round-trip per 100 deletes; anything the batch rejected is retried singly
+            failed = self._batch_delete(files, trash=trash)
+            failed_ids = {file['id'] for file in failed}
             for file in files:
-                if self.delete_file(file['id']):
-                    print(f"    🗑️ Deleted old file: {file['name']}")
+                if file['id'] not in failed_ids:
+                    print(f"    🗑️ {action} old file: {file['name']}")
                     deleted_count += 1
             
+            if failed:
+                with ThreadPoolExecutor(max_workers=min(self.DELETE_WORKERS, len(failed))) as executor:
+                    futures = {
+                        executor.submit(self.delete_file, file['id'], trash): file
+                        for file in failed
+                    }
+                    for future in as_completed(futures):
+                        if future.result():
+                            print(f"    🗑️ {action} old file: {futures[future]['name']}")
+                            deleted_count += 1
+            
             return deleted_count
             
         except Exception as e: